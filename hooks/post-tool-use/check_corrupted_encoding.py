@@ -2,7 +2,7 @@
 # /// script
 # requires-python = ">=3.11"
 # dependencies = [
-#   "chardet>=5.2.0",
+#   "faust-cchardet>=2.1.19",
 # ]
 # ///
 """
@@ -12,15 +12,16 @@ Checks files after they've been written/edited for encoding issues and reports w
 
 from __future__ import annotations
 
+import codecs
+import functools
+import io
 import json
-import subprocess
+import os
+import socket
 import sys
-import traceback
 from pathlib import Path
 from typing import Any, NoReturn, TypedDict
 
-import chardet  # pyright: ignore[reportMissingImports]
-
 
 class Config:
     """Configuration constants for the hook."""
@@ -28,6 +29,40 @@ class Config:
     EXIT_CODE_WARNING: int = 2
     EXIT_CODE_SUCCESS: int = 0
     REPLACEMENT_CHAR = "\ufffd"
+    MAX_SCAN_BYTES: int = 64 * 1024
+    DETECTION_CHUNK_BYTES: int = 8 * 1024
+    NULL_BYTE_SCAN_BYTES: int = 8 * 1024
+    MIME_SNIFF_BYTES: int = 512
+    TEXT_LIKE_MIME_TYPES: frozenset[str] = frozenset(
+        {"inode/x-empty", "application/json", "application/xml", "application/javascript", "application/x-empty"}
+    )
+    MAGIC_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+        (b"\x7fELF", "application/x-executable"),
+        (b"\xca\xfe\xba\xbe", "application/x-mach-binary"),
+        (b"\xcf\xfa\xed\xfe", "application/x-mach-binary"),
+        (b"PK\x03\x04", "application/zip"),
+        (b"\x1f\x8b", "application/gzip"),
+        (b"\xfd7zXZ\x00", "application/x-xz"),
+        (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+        (b"\x28\xb5\x2f\xfd", "application/zstd"),
+        (b"%PDF", "application/pdf"),
+        (b"\x89PNG", "image/png"),
+        (b"GIF8", "image/gif"),
+        (b"\xff\xd8\xff", "image/jpeg"),
+        (b"\x00asm", "application/wasm"),
+        (b"SQLite format 3\x00", "application/vnd.sqlite3"),
+    )
+    DAEMON_SOCKET_PATH: Path = Path.home() / ".claude" / "hooks-daemon.sock"
+    DAEMON_TIMEOUT_SECONDS: float = 30.0
+    DAEMON_RECV_BUFFER_SIZE: int = 64 * 1024
+    TEXT_BYTES: bytes = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7F})
+    BYTE_ORDER_MARKS: dict[bytes, str] = {
+        b"\xef\xbb\xbf": "utf-8-sig",
+        b"\xff\xfe\x00\x00": "utf-32-le",
+        b"\x00\x00\xfe\xff": "utf-32-be",
+        b"\xff\xfe": "utf-16-le",
+        b"\xfe\xff": "utf-16-be",
+    }
 
 
 class Violation(TypedDict):
@@ -78,6 +113,14 @@ ClaudeCodeToolInput = WriteToolInput | EditToolInput | MultiEditToolInput | Note
 
 def main() -> None:
     """Main entry point for the post-tool-use encoding checker."""
+    exit_code = _forward_to_daemon()
+    if exit_code is not None:
+        sys.exit(exit_code)
+    run_inline()
+
+
+def run_inline() -> None:
+    """Run the encoding check in the current process."""
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
@@ -157,20 +200,19 @@ def check_file_encoding(file_path: str) -> list[Violation]:
         if not path_obj.exists():
             return []
 
-        # #given: Check if file is binary using 'file' command
-        file_type_result = subprocess.run(
-            ["file", "--mime-type", "--brief", str(path_obj)],
-            check=False,
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-
-        # #when: file command detects binary or non-text MIME type
-        mime_type = file_type_result.stdout.strip()
-        if file_type_result.returncode == 0:
-            # #then: Report as binary/corrupted if not text
-            if not mime_type.startswith("text/") and mime_type not in ["inode/x-empty", "application/json"]:
+        with path_obj.open("rb") as file:
+            # #given: Read a bounded sample from the head of the file
+            raw_bytes = file.read(Config.MAX_SCAN_BYTES)
+
+            # #when: Sample starts with a byte order mark
+            if _detect_bom_encoding(raw_bytes):
+                # #then: Encoding is declared explicitly, skip detection
+                return []
+
+            # #when: Magic number sniffing detects binary or non-text MIME type
+            mime_type = _sniff_mime(raw_bytes[: Config.MIME_SNIFF_BYTES])
+            if not (mime_type.startswith("text/") or mime_type in Config.TEXT_LIKE_MIME_TYPES):
+                # #then: Report as binary/corrupted if not text
                 return [
                     Violation(
                         line=1,
@@ -180,61 +222,63 @@ def check_file_encoding(file_path: str) -> list[Violation]:
                     )
                 ]
 
-        # #given: Read file bytes to check for null bytes (strong binary indicator)
-        raw_bytes = path_obj.read_bytes()
-
-        # #when: File contains null bytes
-        if b"\x00" in raw_bytes:
-            # #then: Report as binary
-            return [
-                Violation(
-                    line=1,
-                    text="File contains null bytes (binary file)",
-                    issue_type="null_bytes",
-                    full_line="<binary data>",
-                )
-            ]
-
-        # #given: Try UTF-8 decoding with error tracking
-        try:
-            content = raw_bytes.decode("utf-8")
-            # #when: Successful UTF-8 decode but contains replacement chars
-            if Config.REPLACEMENT_CHAR in content:
-                # #then: Report corruption (replacement chars indicate decode issues)
-                replacement_count = content.count(Config.REPLACEMENT_CHAR)
+            # #when: Head of the file contains null bytes
+            if raw_bytes.find(b"\x00", 0, Config.NULL_BYTE_SCAN_BYTES) != -1:
+                # #then: Report as binary
                 return [
                     Violation(
                         line=1,
-                        text=f"UTF-8 decode succeeded but contains {replacement_count} replacement characters",
-                        issue_type="replacement_chars_in_decode",
-                        full_line=content.split("\n")[0][:100] if content else "",
+                        text="File contains null bytes (binary file)",
+                        issue_type="null_bytes",
+                        full_line="<binary data>",
                     )
                 ]
-        except UnicodeDecodeError:
-            # #when: UTF-8 decode fails
-            # #then: Try chardet to identify encoding
-            detection_result = chardet.detect(raw_bytes)
-            if detection_result["encoding"]:
-                try:
-                    _content = raw_bytes.decode(detection_result["encoding"])
-                except (UnicodeDecodeError, LookupError):
+
+            # #given: Try UTF-8 decoding incrementally with error tracking
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                content = decoder.decode(raw_bytes)
+                replacement_count = content.count(Config.REPLACEMENT_CHAR)
+                while chunk := file.read(Config.MAX_SCAN_BYTES):
+                    replacement_count += decoder.decode(chunk).count(Config.REPLACEMENT_CHAR)
+                decoder.decode(b"", final=True)
+
+                # #when: Successful UTF-8 decode but contains replacement chars
+                if replacement_count:
+                    # #then: Report corruption (replacement chars indicate decode issues)
                     return [
                         Violation(
                             line=1,
-                            text=f"Failed to decode file with detected encoding: {detection_result['encoding']}",
-                            issue_type="decode_error",
+                            text=f"UTF-8 decode succeeded but contains {replacement_count} replacement characters",
+                            issue_type="replacement_chars_in_decode",
+                            full_line=content.partition("\n")[0][:100],
+                        )
+                    ]
+            except UnicodeDecodeError:
+                # #when: UTF-8 decode fails
+                # #then: Try chardet on the sample to identify encoding
+                detected_encoding = _detect_encoding(raw_bytes)
+                if detected_encoding:
+                    try:
+                        _content = codecs.getincrementaldecoder(detected_encoding)().decode(raw_bytes)
+                    except (UnicodeDecodeError, LookupError):
+                        return [
+                            Violation(
+                                line=1,
+                                text=f"Failed to decode file with detected encoding: {detected_encoding}",
+                                issue_type="decode_error",
+                                full_line="<binary data>",
+                            )
+                        ]
+                else:
+                    return [
+                        Violation(
+                            line=1,
+                            text="Could not detect file encoding",
+                            issue_type="unknown_encoding",
                             full_line="<binary data>",
                         )
                     ]
-            else:
-                return [
-                    Violation(
-                        line=1,
-                        text="Could not detect file encoding",
-                        issue_type="unknown_encoding",
-                        full_line="<binary data>",
-                    )
-                ]
 
         return []
 
@@ -249,6 +293,40 @@ def check_file_encoding(file_path: str) -> list[Violation]:
         ]
 
 
+def _detect_bom_encoding(head: bytes) -> str | None:
+    """Return the encoding declared by a leading byte order mark, if any."""
+    for bom, encoding in Config.BYTE_ORDER_MARKS.items():
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def _sniff_mime(head: bytes) -> str:
+    """Guess the MIME type from magic numbers in the head of the file."""
+    if not head:
+        return "inode/x-empty"
+    for signature, mime_type in Config.MAGIC_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    if head.translate(None, Config.TEXT_BYTES):
+        return "application/octet-stream"
+    return "text/plain"
+
+
+def _detect_encoding(sample: bytes) -> str | None:
+    """Feed the sample to the detector in chunks, stopping as soon as it is confident."""
+    import cchardet as chardet  # pyright: ignore[reportMissingImports]
+
+    detector = chardet.UniversalDetector()
+    for offset in range(0, len(sample), Config.DETECTION_CHUNK_BYTES):
+        detector.feed(sample[offset : offset + Config.DETECTION_CHUNK_BYTES])
+        if detector.done:
+            break
+    detector.close()
+    encoding: str | None = detector.result["encoding"]
+    return encoding
+
+
 def handle_findings(violations: list[Violation], file_path: str) -> NoReturn:
     """Handle detected violations and exit appropriately."""
     if not violations:
@@ -270,22 +348,55 @@ def handle_findings(violations: list[Violation], file_path: str) -> NoReturn:
 
 def _get_display_path(file_path: str) -> str:
     """Get display-friendly path relative to cwd if possible."""
-    cwd = Path.cwd()
+    cwd = _get_cwd()
+    # Resolve symlinks and '..' like Path.resolve, so paths display the same as in the other hooks
+    abs_path = os.path.realpath(file_path)
     try:
-        path_obj = Path(file_path).resolve()
-        if path_obj.is_relative_to(cwd):
-            relative_path = path_obj.relative_to(cwd)
-            result = str(relative_path)
-            return result
+        if os.path.commonpath([abs_path, cwd]) == cwd:
+            return os.path.relpath(abs_path, cwd)
         return file_path
-    except (ValueError, OSError):
+    except ValueError:
         return file_path
 
 
+@functools.lru_cache(maxsize=1)
+def _get_cwd() -> str:
+    """Get the resolved current working directory, cached for the lifetime of the hook."""
+    return os.path.realpath(os.getcwd())
+
+
+def _forward_to_daemon() -> int | None:
+    """Hand the hook input to the hooks daemon; return its exit code, or None to run inline."""
+    if not Config.DAEMON_SOCKET_PATH.exists():
+        return None
+
+    input_raw = sys.stdin.read()
+    request = {"hook": Path(__file__).stem, "cwd": os.getcwd(), "payload": input_raw}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(Config.DAEMON_TIMEOUT_SECONDS)
+            client.connect(str(Config.DAEMON_SOCKET_PATH))
+            client.sendall(json.dumps(request).encode())
+            client.shutdown(socket.SHUT_WR)
+            response_raw = b"".join(iter(lambda: client.recv(Config.DAEMON_RECV_BUFFER_SIZE), b""))
+        response: dict[str, Any] = json.loads(response_raw)
+    except (OSError, ValueError):
+        sys.stdin = io.StringIO(input_raw)
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    exit_code: int = response["exit_code"]
+    return exit_code
+
+
 def _handle_hook_error(e: Exception) -> NoReturn:
     """Handle errors in hook execution."""
     print(f"ERROR in encoding check hook: {e}", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr)
+    if os.environ.get("CLAUDE_HOOK_DEBUG"):
+        import traceback
+
+        traceback.print_exc(file=sys.stderr)
     sys.exit(Config.EXIT_CODE_SUCCESS)
 
 
@@ -12,22 +12,36 @@ Detects TypedDict declarations with total=False and suggests using NotRequired i
 
 from __future__ import annotations
 
+import functools
+import io
 import json
+import os
 import re
+import socket
 import sys
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Any,
     Literal,
     NoReturn,
     TypedDict,
 )
 
-import ast_grep_py as sg
+if TYPE_CHECKING:
+    import ast_grep_py as sg
 
 
 def main() -> None:
     """Main entry point for the PostToolUse hook."""
+    exit_code = _forward_to_daemon()
+    if exit_code is not None:
+        sys.exit(exit_code)
+    run_inline()
+
+
+def run_inline() -> None:
+    """Run the TypedDict check in the current process."""
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
@@ -41,6 +55,18 @@ EXIT_CODE_BLOCK_TOOL: int = 2
 DEFAULT_TEXT_TRUNCATION: int = 80
 LONG_TEXT_TRUNCATION: int = 120
 TAB: str = "\t"
+DAEMON_SOCKET_PATH: Path = Path.home() / ".claude" / "hooks-daemon.sock"
+DAEMON_TIMEOUT_SECONDS: float = 30.0
+DAEMON_RECV_BUFFER_SIZE: int = 64 * 1024
+TYPEDDICT_CALLEES: frozenset[str] = frozenset({"TypedDict", "typing.TypedDict"})
+REQUIRES_PYTHON_PATTERN: re.Pattern[str] = re.compile(r'requires-python\s*=\s*"[^"]*3\.(\d+)')
+TARGET_VERSION_PATTERN: re.Pattern[str] = re.compile(r'target-version\s*=\s*"py3(\d+)"')
+CLASS_TOTAL_FALSE_PATTERN: re.Pattern[str] = re.compile(r"class\s+\w+\s*\([^)]*TypedDict[^)]*,\s*total\s*=\s*False[^)]*\)")
+ASSIGNMENT_TARGET_PATTERN: re.Pattern[str] = re.compile(r"(\w+)\s*=")
+CLASS_NAME_PATTERN: re.Pattern[str] = re.compile(r"class\s+(\w+)")
+TOTAL_FALSE_ARG_PATTERN: re.Pattern[str] = re.compile(r",\s*total\s*=\s*False")
+EMPTY_TYPEDDICT_BASES_PATTERN: re.Pattern[str] = re.compile(r"\(\s*TypedDict\s*,\s*\)")
+EMPTY_TYPING_TYPEDDICT_BASES_PATTERN: re.Pattern[str] = re.compile(r"\(\s*typing\.TypedDict\s*,\s*\)")
 
 
 class TotalFalseIssue(TypedDict):
@@ -107,6 +133,17 @@ class TotalFalseContext:
 
 def detect_total_false_violations(code: str) -> list[TotalFalseIssue]:
     """Detect all TypedDict total=False violations in the given code."""
+    if not _may_contain_total_false(code):
+        return []
+
+    return list(_detect_total_false_violations_cached(code))
+
+
+@functools.lru_cache(maxsize=64)
+def _detect_total_false_violations_cached(code: str) -> tuple[TotalFalseIssue, ...]:
+    """Parse the code and detect violations, memoized by source content."""
+    import ast_grep_py as sg
+
     root: sg.SgRoot = sg.SgRoot(code, "python")
     node: sg.SgNode = root.root()
 
@@ -120,7 +157,7 @@ def detect_total_false_violations(code: str) -> list[TotalFalseIssue]:
     call_violations: list[TotalFalseIssue] = _detect_function_calls(node)
     violations.extend(call_violations)
 
-    return violations
+    return tuple(violations)
 
 
 def build_warning_message(violations: list[TotalFalseIssue], file_path: str) -> str:
@@ -165,7 +202,7 @@ Detected violations:
 
 def _read_file_content(file_path: str) -> str | None:
     """Read file content with error handling."""
-    if not file_path or not Path(file_path).exists():
+    if not file_path:
         return None
 
     try:
@@ -238,13 +275,13 @@ def process_tool_input(data: PostToolUseInput) -> list[TotalFalseIssue]:
     if not isinstance(tool_input, dict):
         return []
 
-    new_violations: list[TotalFalseIssue] = []
-    existing_violations: set[str] = _get_existing_violations(file_path, tool_name, tool_input)
-
     content = _read_file_content(file_path)
-    if content is None:
+    if content is None or not _may_contain_total_false(content):
         return []
 
+    new_violations: list[TotalFalseIssue] = []
+    existing_violations: set[str] = _get_existing_violations(content, tool_name, tool_input)
+
     all_violations = detect_total_false_violations(content)
 
     for violation in all_violations:
@@ -289,6 +326,31 @@ def _execute_hook_pipeline() -> NoReturn:
     handle_findings(violations, file_path)
 
 
+def _forward_to_daemon() -> int | None:
+    """Hand the hook input to the hooks daemon; return its exit code, or None to run inline."""
+    if not DAEMON_SOCKET_PATH.exists():
+        return None
+
+    input_raw = sys.stdin.read()
+    request = {"hook": Path(__file__).stem, "cwd": os.getcwd(), "payload": input_raw}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(DAEMON_TIMEOUT_SECONDS)
+            client.connect(str(DAEMON_SOCKET_PATH))
+            client.sendall(json.dumps(request).encode())
+            client.shutdown(socket.SHUT_WR)
+            response_raw = b"".join(iter(lambda: client.recv(DAEMON_RECV_BUFFER_SIZE), b""))
+        response: dict[str, Any] = json.loads(response_raw)
+    except (OSError, ValueError):
+        sys.stdin = io.StringIO(input_raw)
+        return None
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    exit_code: int = response["exit_code"]
+    return exit_code
+
+
 def _handle_hook_error() -> NoReturn:
     """Handle errors in hook execution."""
     print("[check-typeddict-total-false] Skipping: Unexpected error occurred")
@@ -299,6 +361,7 @@ def _is_excluded_path(file_path: str) -> bool:
     return False
 
 
+@functools.lru_cache(maxsize=1)
 def _check_python_version_311_or_higher() -> bool:
     """Check if Python version is 3.11 or higher."""
     if sys.version_info.major > 3 or (sys.version_info.major == 3 and sys.version_info.minor >= 11):
@@ -310,12 +373,12 @@ def _check_python_version_311_or_higher() -> bool:
             with open(pyproject_path) as f:
                 content = f.read()
 
-            match = re.search(r'requires-python\s*=\s*"[^"]*3\.(\d+)', content)
+            match = REQUIRES_PYTHON_PATTERN.search(content)
             if match:
                 minor = int(match.group(1))
                 return minor >= 11
 
-            match = re.search(r'target-version\s*=\s*"py3(\d+)"', content)
+            match = TARGET_VERSION_PATTERN.search(content)
             if match:
                 minor = int(match.group(1))
                 return minor >= 11
@@ -325,23 +388,29 @@ def _check_python_version_311_or_higher() -> bool:
     return False
 
 
+def _may_contain_total_false(code: str) -> bool:
+    """Cheap substring check that rules out code without any TypedDict total=False."""
+    return "TypedDict" in code and "total=False" in code
+
+
 def _detect_class_definitions(node: sg.SgNode) -> list[TotalFalseIssue]:
     """Detect class MyDict(TypedDict, total=False) patterns."""
     violations: list[TotalFalseIssue] = []
 
-    class_nodes: list[sg.SgNode] = node.find_all(pattern="class $NAME($$$BASES): $BODY")
+    class_nodes: list[sg.SgNode] = node.find_all(kind="class_definition", regex="total=False")
 
     for class_node in class_nodes:
-        class_text = class_node.text()
+        superclasses: sg.SgNode | None = class_node.field("superclasses")
+        if superclasses is None:
+            continue
+
+        bases_text = superclasses.text()
 
         # Pattern: class NAME(TypedDict, total=False) or class NAME(typing.TypedDict, total=False)
         if (
-            "TypedDict" in class_text
-            and "total=False" in class_text
-            and re.search(
-                r"class\s+\w+\s*\([^)]*TypedDict[^)]*,\s*total\s*=\s*False[^)]*\)",
-                class_text,
-            )
+            "TypedDict" in bases_text
+            and "total=False" in bases_text
+            and CLASS_TOTAL_FALSE_PATTERN.search(class_node.text())
         ):
             class_name = _extract_class_name(class_node)
             context = TotalFalseContext(
@@ -359,51 +428,29 @@ def _detect_function_calls(node: sg.SgNode) -> list[TotalFalseIssue]:
     """Detect MyDict = TypedDict('MyDict', {...}, total=False) patterns."""
     violations: list[TotalFalseIssue] = []
 
-    typeddict_calls: list[sg.SgNode] = node.find_all(pattern="TypedDict($$$ARGS)")
-
-    for call_node in typeddict_calls:
-        call_text = call_node.text()
+    call_nodes: list[sg.SgNode] = node.find_all(kind="call", regex="total=False")
 
-        if "total=False" in call_text:
-            parent = call_node.parent()
-            class_name = "UnknownDict"
+    for call_node in call_nodes:
+        function_node: sg.SgNode | None = call_node.field("function")
+        if function_node is None or function_node.text() not in TYPEDDICT_CALLEES:
+            continue
 
-            if parent and parent.kind() == "assignment":
-                assignment_text = parent.text()
-                match = re.match(r"(\w+)\s*=", assignment_text)
-                if match:
-                    class_name = match.group(1)
+        parent = call_node.parent()
+        class_name = "UnknownDict"
 
-            context = TotalFalseContext(
-                issue_type="function_call",
-                node=call_node,
-                class_name=class_name,
-            )
-            issue = _create_total_false_issue(context)
-            violations.append(issue)
-
-    typing_typeddict_calls: list[sg.SgNode] = node.find_all(pattern="typing.TypedDict($$$ARGS)")
-
-    for call_node in typing_typeddict_calls:
-        call_text = call_node.text()
-
-        if "total=False" in call_text:
-            parent = call_node.parent()
-            class_name = "UnknownDict"
+        if parent and parent.kind() == "assignment":
+            assignment_text = parent.text()
+            match = ASSIGNMENT_TARGET_PATTERN.match(assignment_text)
+            if match:
+                class_name = match.group(1)
 
-            if parent and parent.kind() == "assignment":
-                assignment_text = parent.text()
-                match = re.match(r"(\w+)\s*=", assignment_text)
-                if match:
-                    class_name = match.group(1)
-
-            context = TotalFalseContext(
-                issue_type="function_call",
-                node=call_node,
-                class_name=class_name,
-            )
-            issue = _create_total_false_issue(context)
-            violations.append(issue)
+        context = TotalFalseContext(
+            issue_type="function_call",
+            node=call_node,
+            class_name=class_name,
+        )
+        issue = _create_total_false_issue(context)
+        violations.append(issue)
 
     return violations
 
@@ -450,7 +497,7 @@ def _extract_class_name(class_node: sg.SgNode) -> str:
         return name_node.text()
 
     class_text = class_node.text()
-    match = re.match(r"class\s+(\w+)", class_text)
+    match = CLASS_NAME_PATTERN.match(class_text)
     if match:
         return match.group(1)
 
@@ -459,18 +506,23 @@ def _extract_class_name(class_node: sg.SgNode) -> str:
 
 def _get_display_path(file_path: str) -> str:
     """Get display-friendly path relative to cwd if possible."""
-    cwd: Path = Path.cwd()
+    cwd: str = _get_cwd()
+    # Resolve symlinks and '..' like Path.resolve, so paths display the same as in the other hooks
+    abs_path: str = os.path.realpath(file_path)
     try:
-        path_obj: Path = Path(file_path).resolve()
-        if path_obj.is_relative_to(cwd):
-            relative_path: Path = path_obj.relative_to(cwd)
-            result: str = str(relative_path)
-            return result
+        if os.path.commonpath([abs_path, cwd]) == cwd:
+            return os.path.relpath(abs_path, cwd)
         return file_path
-    except (ValueError, OSError):
+    except ValueError:
         return file_path
 
 
+@functools.lru_cache(maxsize=1)
+def _get_cwd() -> str:
+    """Get the resolved current working directory, cached for the lifetime of the hook."""
+    return os.path.realpath(os.getcwd())
+
+
 def _truncate_text(text: str, max_length: int = DEFAULT_TEXT_TRUNCATION) -> str:
     """Truncate text to specified length with ellipsis if needed."""
     if len(text) <= max_length:
@@ -489,7 +541,7 @@ def _truncate_text(text: str, max_length: int = DEFAULT_TEXT_TRUNCATION) -> str:
 
 
 def _get_existing_violations(
-    file_path: str,
+    current_content: str,
     tool_name: str,
     tool_input: WriteToolInput | EditToolInput | MultiEditToolInput | NotebookEditToolInput,
 ) -> set[str]:
@@ -497,43 +549,35 @@ def _get_existing_violations(
     existing_violations: set[str] = set()
 
     if tool_name == "Edit":
-        if file_path and Path(file_path).exists():
-            try:
-                old_string = tool_input["old_string"]  # type: ignore[literal-required]
-                new_string = tool_input["new_string"]  # type: ignore[literal-required]
-
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
-
-                if old_string and new_string and new_string in current_content:
-                    pre_edit_content: str = current_content.replace(new_string, old_string, 1)
-                    old_violations = detect_total_false_violations(pre_edit_content)
-                    for violation in old_violations:
-                        existing_violations.add(_create_violation_key(violation))
-            except Exception:
-                pass
-
-    elif tool_name == "MultiEdit":
-        if file_path and Path(file_path).exists():
-            try:
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
-
-                pre_edit_content: str = current_content
-                edits = tool_input["edits"]  # type: ignore[literal-required]
-
-                for edit in reversed(edits):
-                    if isinstance(edit, dict):
-                        edit_old_string = edit["old_string"]
-                        edit_new_string = edit["new_string"]
-                        if edit_old_string and edit_new_string and edit_new_string in pre_edit_content:
-                            pre_edit_content = pre_edit_content.replace(edit_new_string, edit_old_string, 1)
+        try:
+            old_string = tool_input["old_string"]  # type: ignore[literal-required]
+            new_string = tool_input["new_string"]  # type: ignore[literal-required]
 
+            if old_string and new_string and new_string in current_content:
+                pre_edit_content: str = current_content.replace(new_string, old_string, 1)
                 old_violations = detect_total_false_violations(pre_edit_content)
                 for violation in old_violations:
                     existing_violations.add(_create_violation_key(violation))
-            except Exception:
-                pass
+        except Exception:
+            pass
+
+    elif tool_name == "MultiEdit":
+        try:
+            pre_edit_content: str = current_content
+            edits = tool_input["edits"]  # type: ignore[literal-required]
+
+            for edit in reversed(edits):
+                if isinstance(edit, dict):
+                    edit_old_string = edit["old_string"]
+                    edit_new_string = edit["new_string"]
+                    if edit_old_string and edit_new_string and edit_new_string in pre_edit_content:
+                        pre_edit_content = pre_edit_content.replace(edit_new_string, edit_old_string, 1)
+
+            old_violations = detect_total_false_violations(pre_edit_content)
+            for violation in old_violations:
+                existing_violations.add(_create_violation_key(violation))
+        except Exception:
+            pass
 
     return existing_violations
 
@@ -545,12 +589,7 @@ def _create_violation_key(violation: TotalFalseIssue) -> str:
 
 def _format_code_with_line_numbers(code: str, start_line: int) -> str:
     """Format code with line numbers."""
-    lines = code.split("\n")
-    formatted_lines = []
-    for i, line in enumerate(lines):
-        line_num = start_line + i
-        formatted_lines.append(f"{line_num:6} │ {line}")
-    return "\n".join(formatted_lines)
+    return "\n".join(f"{line_num:6} │ {line}" for line_num, line in enumerate(code.split("\n"), start_line))
 
 
 def _generate_suggested_fix(violation: TotalFalseIssue) -> str:
@@ -561,9 +600,9 @@ def _generate_suggested_fix(violation: TotalFalseIssue) -> str:
 
         for line in lines:
             if "total=False" in line:
-                fixed_line = re.sub(r",\s*total\s*=\s*False", "", line)
-                fixed_line = re.sub(r"\(\s*TypedDict\s*,\s*\)", "(TypedDict)", fixed_line)
-                fixed_line = re.sub(r"\(\s*typing\.TypedDict\s*,\s*\)", "(typing.TypedDict)", fixed_line)
+                fixed_line = TOTAL_FALSE_ARG_PATTERN.sub("", line)
+                fixed_line = EMPTY_TYPEDDICT_BASES_PATTERN.sub("(TypedDict)", fixed_line)
+                fixed_line = EMPTY_TYPING_TYPEDDICT_BASES_PATTERN.sub("(typing.TypedDict)", fixed_line)
                 result_lines.append(fixed_line)
             else:
                 result_lines.append(line)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#   "ast-grep-py>=0.24.1",
+#   "faust-cchardet>=2.1.19",
+# ]
+# ///
+"""
+Long-running daemon that serves post-tool-use hooks from a warm interpreter.
+Hooks forward their stdin payload over a UNIX socket and fall back to inline execution when it is not running.
+
+Usage:
+    uv run ~/.claude/hooks/post-tool-use/hooks_daemon.py
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import TypedDict
+
+import ast_grep_py  # noqa: F401  # pyright: ignore[reportMissingImports, reportUnusedImport]
+import cchardet  # noqa: F401  # pyright: ignore[reportMissingImports, reportUnusedImport]
+
+SOCKET_PATH: Path = Path.home() / ".claude" / "hooks-daemon.sock"
+HOOK_DIR: Path = Path(__file__).parent
+SERVED_HOOKS: frozenset[str] = frozenset({"check_corrupted_encoding", "check_typeddict_total_false"})
+RECV_BUFFER_SIZE: int = 64 * 1024
+
+
+class DaemonRequest(TypedDict):
+    hook: str
+    cwd: str
+    payload: str
+
+
+class DaemonResponse(TypedDict):
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+class HookRegistry:
+    """Loads served hook modules once and reloads them when their source changes."""
+
+    def __init__(self) -> None:
+        self._modules: dict[str, tuple[int, ModuleType]] = {}
+
+    def get(self, hook_name: str) -> ModuleType | None:
+        if hook_name not in SERVED_HOOKS:
+            return None
+
+        hook_path = HOOK_DIR / f"{hook_name}.py"
+        mtime_ns = hook_path.stat().st_mtime_ns
+        cached = self._modules.get(hook_name)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+
+        spec = importlib.util.spec_from_file_location(hook_name, hook_path)
+        if spec is None or spec.loader is None:
+            return None
+
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self._modules[hook_name] = (mtime_ns, module)
+        return module
+
+
+def main() -> None:
+    """Main entry point for the hooks daemon."""
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SOCKET_PATH.unlink(missing_ok=True)
+
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+    registry = HookRegistry()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(SOCKET_PATH))
+        os.chmod(SOCKET_PATH, 0o600)
+        server.listen()
+        print(f"[hooks-daemon] Listening on {SOCKET_PATH}", file=sys.stderr)
+
+        try:
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    handle_connection(connection, registry)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            SOCKET_PATH.unlink(missing_ok=True)
+
+
+def handle_connection(connection: socket.socket, registry: HookRegistry) -> None:
+    """Serve a single hook request; closing without a response makes the client run inline."""
+    try:
+        request_raw = b"".join(iter(lambda: connection.recv(RECV_BUFFER_SIZE), b""))
+        request: DaemonRequest = json.loads(request_raw)
+        module = registry.get(request["hook"])
+        if module is None:
+            return
+
+        response = run_hook(module, request)
+        connection.sendall(json.dumps(response).encode())
+    except Exception as e:
+        print(f"[hooks-daemon] Request failed: {e}", file=sys.stderr)
+
+
+def run_hook(module: ModuleType, request: DaemonRequest) -> DaemonResponse:
+    """Run a hook module in-process with its stdio, cwd and caches scoped to the request."""
+    _clear_module_caches(module)
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    previous_cwd = os.getcwd()
+    previous_stdin = sys.stdin
+
+    try:
+        os.chdir(request["cwd"])
+        sys.stdin = io.StringIO(request["payload"])
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                module.run_inline()
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 0
+    finally:
+        sys.stdin = previous_stdin
+        os.chdir(previous_cwd)
+
+    return DaemonResponse(exit_code=exit_code, stdout=stdout.getvalue(), stderr=stderr.getvalue())
+
+
+def _clear_module_caches(module: ModuleType) -> None:
+    """Reset zero-argument lru_cache helpers, which memoize cwd-dependent state; input-keyed caches stay warm."""
+    for attribute in vars(module).values():
+        cache_clear = getattr(attribute, "cache_clear", None)
+        wrapped = getattr(attribute, "__wrapped__", None)
+        if callable(cache_clear) and wrapped is not None and wrapped.__code__.co_argcount == 0:
+            cache_clear()
+
+
+if __name__ == "__main__":
+    main()
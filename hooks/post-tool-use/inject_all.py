@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.11"
+# dependencies = [
+#     "orjson",
+# ]
+# ///
+# pyright: reportMissingImports=false
+"""
+Runs the conftest, knowledge and language guide injectors in a single interpreter.
+The payload is read once, and the transcript Read index written by the first injector is reused by the others.
+Injectors run in the order given on the command line, or in INJECT_HOOKS order when none are given.
+
+Usage:
+    uv run ~/.claude/hooks/post-tool-use/inject_all.py
+    uv run ~/.claude/hooks/post-tool-use/inject_all.py inject_knowledge inject_language_guide inject_conftest
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import sys
+import traceback
+from pathlib import Path
+from types import ModuleType
+
+HOOK_DIR = Path(__file__).parent
+INJECT_HOOKS = ("inject_conftest", "inject_knowledge", "inject_language_guide")
+
+
+def load_hook(hook_name: str) -> ModuleType | None:
+    spec = importlib.util.spec_from_file_location(hook_name, HOOK_DIR / f"{hook_name}.py")
+    if spec is None or spec.loader is None:
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception as e:
+        print(f"[inject-all] Failed to load {hook_name}: {e}", file=sys.stderr)
+        return None
+
+    return module
+
+
+def run_hook(module: ModuleType, payload: bytes) -> tuple[int, str, str]:
+    """Run an injector's main() with the shared payload as stdin, as if it were its own process."""
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+    previous_stdin = sys.stdin
+
+    try:
+        sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                module.main()
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 0
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.stdin = previous_stdin
+
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def main() -> None:
+    payload = sys.stdin.buffer.read()
+    messages_to_inject: list[str] = []
+    hook_names = [name for name in sys.argv[1:] if name in INJECT_HOOKS] or list(INJECT_HOOKS)
+    failed = False
+
+    for hook_name in hook_names:
+        module = load_hook(hook_name)
+        if module is None:
+            failed = True
+            continue
+
+        exit_code, stdout, stderr = run_hook(module, payload)
+        sys.stdout.write(stdout)
+
+        if exit_code == 2 and stderr:
+            messages_to_inject.append(stderr)
+        elif exit_code != 0 and stderr:
+            # A crashing injector must stay visible, as it was when each one ran as its own command
+            print(f"[inject-all] {hook_name} exited with {exit_code}:\n{stderr}", file=sys.stderr, end="")
+            failed = True
+
+    if messages_to_inject:
+        print("".join(messages_to_inject), file=sys.stderr, end="")
+        sys.exit(2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
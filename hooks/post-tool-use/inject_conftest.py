@@ -3,21 +3,23 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #     "orjson",
-#     "toml>=0.10.2",
 # ]
 # ///
 # pyright: reportMissingImports=false
 
 from __future__ import annotations
 
-import hashlib
+import fnmatch
+import functools
+import os
+import re
 import sys
-from datetime import datetime
+import tomllib
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
-import toml
+from transcript_reads import canonical_path, load_read_paths
 
 
 class ReadToolInput(TypedDict):
@@ -82,77 +84,90 @@ class ConftestInfo(TypedDict):
     path: str
     distance: int
     hash: str
-    last_modified: str
 
 
-class ProjectRootFinder:
-    PROJECT_ROOT_MARKERS = ["pyproject.toml", ".venv", ".git"]
+PROJECT_ROOT_MARKERS = frozenset({"pyproject.toml", ".venv", ".git"})
+
+
+@functools.lru_cache(maxsize=256)
+def _find_project_root_cached(start_dir: str) -> Path | None:
+    current_dir = start_dir
+    parent_dir = os.path.dirname(current_dir)
+
+    while current_dir != parent_dir:
+        try:
+            with os.scandir(current_dir) as entries:
+                if any(entry.name in PROJECT_ROOT_MARKERS for entry in entries):
+                    return Path(current_dir)
+        except OSError:
+            pass
+        current_dir, parent_dir = parent_dir, os.path.dirname(parent_dir)
 
+    return None
+
+
+class ProjectRootFinder:
     @classmethod
     def find_root(cls, start_path: Path) -> Path | None:
-        current_dir = start_path.resolve()
+        return _find_project_root_cached(str(start_path.resolve()))
 
-        while current_dir != current_dir.parent:
-            for marker in cls.PROJECT_ROOT_MARKERS:
-                marker_path = current_dir / marker
-                if marker_path.exists() and (
-                    marker_path.is_file() or marker_path.is_dir()
-                ):
-                    return current_dir
-            current_dir = current_dir.parent
 
-        return None
+DEFAULT_TEST_PATTERNS = ("test_*.py", "*_test.py", "*_tests.py", "tests.py")
 
 
-class TestFileDetector:
-    DEFAULT_TEST_PATTERNS = ["test_*.py", "*_test.py", "*_tests.py", "tests.py"]
+@functools.lru_cache(maxsize=None)
+def _load_test_patterns_cached(path_str: str, mtime_ns: int) -> tuple[str, ...]:
+    try:
+        with open(path_str, "rb") as f:
+            config: dict[str, Any] = tomllib.load(f)
+
+        tool_config = config.get("tool", {})
+        pytest_config = tool_config.get("pytest", {})
+        ini_options = pytest_config.get("ini_options", {})
+
+        python_files = ini_options.get("python_files", [])
+        if isinstance(python_files, list) and python_files:
+            return tuple(python_files)
 
+        return DEFAULT_TEST_PATTERNS
+    except Exception:
+        return DEFAULT_TEST_PATTERNS
+
+
+class TestFileDetector:
     def __init__(self) -> None:
         self.test_patterns = self._load_test_patterns()
+        self._pattern_re = re.compile(
+            "|".join(
+                f"(?:{fnmatch.translate(pattern)})"
+                for pattern in self.test_patterns
+            )
+        )
 
-    def _load_test_patterns(self) -> list[str]:
+    def _load_test_patterns(self) -> tuple[str, ...]:
         pyproject_path = Path("pyproject.toml")
 
-        if not pyproject_path.exists():
-            return self.DEFAULT_TEST_PATTERNS
-
         try:
-            with open(pyproject_path, encoding="utf-8") as f:
-                config: dict[str, Any] = toml.load(f)
-
-            tool_config = config.get("tool", {})
-            pytest_config = tool_config.get("pytest", {})
-            ini_options = pytest_config.get("ini_options", {})
-
-            python_files = ini_options.get("python_files", [])
-            if isinstance(python_files, list) and python_files:
-                return python_files
+            mtime_ns = pyproject_path.stat().st_mtime_ns
+        except OSError:
+            return DEFAULT_TEST_PATTERNS
 
-            return self.DEFAULT_TEST_PATTERNS
-        except Exception:
-            return self.DEFAULT_TEST_PATTERNS
+        return _load_test_patterns_cached(str(pyproject_path.resolve()), mtime_ns)
 
     def is_test_file(self, file_path: str) -> bool:
         if not file_path.endswith(".py"):
             return False
 
-        path = Path(file_path)
-        file_name = path.name
+        file_name = Path(file_path).name
 
         if (
             file_name.startswith("test_")
-            or file_name.endswith("_test.py")
-            or file_name.endswith("_tests.py")
+            or file_name.endswith(("_test.py", "_tests.py"))
             or file_name == "tests.py"
         ):
             return True
 
-        for pattern in self.test_patterns:
-            cleaned_pattern = pattern.replace("*", "")
-            if cleaned_pattern in file_name:
-                return True
-
-        return False
+        return bool(self._pattern_re.match(file_name))
 
 
 class ConftestFinder:
@@ -174,9 +189,11 @@ class ConftestFinder:
         existing_paths = {info["path"] for info in conftest_infos}
 
         package_conftests = self._collect_mirrored_package_conftests(existing_paths)
+        # Upward distances count directory levels and package ones start at the offset,
+        # so appending keeps the list ordered by distance
         conftest_infos.extend(package_conftests)
 
-        return sorted(conftest_infos, key=lambda x: x["distance"])
+        return conftest_infos
 
     def _collect_upward_conftests(self) -> list[ConftestInfo]:
         conftest_infos: list[ConftestInfo] = []
@@ -189,45 +206,34 @@ class ConftestFinder:
         except ValueError:
             return conftest_infos
 
-        current_dir = self.test_file.parent
+        root_dir = str(self.project_root)
+        current_dir = str(self.test_file.parent)
+        parent_dir = os.path.dirname(current_dir)
         distance = 0
 
-        while current_dir >= self.project_root and current_dir != current_dir.parent:
-            conftest_path = current_dir / "conftest.py"
-            if conftest_path.is_file():
-                try:
-                    relative_path = conftest_path.relative_to(self.project_root)
-                    path_str = (
-                        str(relative_path)
-                        if relative_path != Path(".")
-                        else "conftest.py"
-                    )
-                except ValueError:
-                    path_str = str(conftest_path)
+        while current_dir != parent_dir:
+            conftest_path = os.path.join(current_dir, "conftest.py")
+            if os.path.isfile(conftest_path):
+                path_str = os.path.relpath(conftest_path, root_dir)
 
                 try:
-                    file_content = conftest_path.read_bytes()
-                    file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-                    last_modified = datetime.fromtimestamp(
-                        conftest_path.stat().st_mtime
-                    ).isoformat()
+                    stat = os.stat(conftest_path)
+                    file_hash = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
                 except OSError:
                     file_hash = "unknown"
-                    last_modified = "unknown"
 
                 conftest_infos.append(
                     ConftestInfo(
                         path=path_str,
                         distance=distance,
                         hash=file_hash,
-                        last_modified=last_modified,
                     )
                 )
 
-            if current_dir == self.project_root:
+            if current_dir == root_dir:
                 break
 
-            current_dir = current_dir.parent
+            current_dir, parent_dir = parent_dir, os.path.dirname(parent_dir)
             distance += 1
 
         return conftest_infos
@@ -268,21 +274,16 @@ class ConftestFinder:
 
                 if path_str not in existing_paths:
                     try:
-                        file_content = pkg_conftest.read_bytes()
-                        file_hash = hashlib.sha256(file_content).hexdigest()[:16]
-                        last_modified = datetime.fromtimestamp(
-                            pkg_conftest.stat().st_mtime
-                        ).isoformat()
+                        stat = pkg_conftest.stat()
+                        file_hash = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
                     except OSError:
                         file_hash = "unknown"
-                        last_modified = "unknown"
 
                     conftest_infos.append(
                         ConftestInfo(
                             path=path_str,
                             distance=self.PACKAGE_CONFTEST_DISTANCE_OFFSET + i,
                             hash=file_hash,
-                            last_modified=last_modified,
                         )
                     )
 
@@ -293,77 +294,25 @@ class ConftestInjector:
     def __init__(self, project_root: Path, transcript_path: str) -> None:
         self.project_root = project_root
         self.transcript_path = Path(transcript_path)
+        self._read_paths = load_read_paths(self.transcript_path)
 
-    def _has_conftest_been_read(self, conftest_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
-
-        try:
-            conftest_path_str = str(conftest_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
-
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict):
-                    continue
-
-                if entry.get("type") != "assistant":
-                    continue
-
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
-
-                if message.get("role") != "assistant":
-                    continue
-
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
-
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use":
-                        continue
-
-                    if block.get("name") != "Read":
-                        continue
-
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
-
-                    if tool_input.get("file_path") == conftest_path_str:
-                        return True
-
-            return False
-
-        except OSError:
-            return False
+    def _has_conftest_been_read(self, conftest_path: str) -> bool:
+        return canonical_path(conftest_path) in self._read_paths
 
     def check_and_inject(self, conftest_info: ConftestInfo) -> str:
         path = conftest_info["path"]
 
-        full_path = self.project_root / path
-        if not full_path.exists():
+        full_path_str = str(self.project_root / path)
+        if not os.path.exists(full_path_str):
             return ""
 
-        if self._has_conftest_been_read(full_path):
+        if self._has_conftest_been_read(full_path_str):
             return ""
 
         warning_message = (
             f"ACTION REQUIRED: Use Read tool to read CONFTEST immediately. READ NOW.\n"
             f"You MUST read the following conftest file before proceeding with the test:\n"
-            f"{full_path}\n\n"
+            f"{full_path_str}\n\n"
         )
 
         return warning_message
@@ -377,7 +326,7 @@ class HookHandler:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
-            input_raw = sys.stdin.read()
+            input_raw = sys.stdin.buffer.read()
             if not input_raw:
                 print(f"[{hook_filename}] Skipping: No input provided")
                 sys.exit(0)
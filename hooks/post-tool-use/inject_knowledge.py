@@ -9,13 +9,13 @@
 
 from __future__ import annotations
 
-import hashlib
+import os
 import sys
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
+from transcript_reads import canonical_path, load_read_paths
 
 
 class EditOperation(TypedDict):
@@ -105,11 +105,10 @@ class KnowledgeInfo(TypedDict):
     distance: int
     type: str
     hash: str
-    last_modified: str
 
 
 class KnowledgeFinder:
-    KNOWLEDGE_FILES = ["claude.md", "agents.md", "readme.md"]
+    KNOWLEDGE_FILES = frozenset({"claude.md", "agents.md", "readme.md"})
 
     def __init__(self, file_path: str, cwd: str | None = None) -> None:
         self.file_path = Path(file_path).resolve()
@@ -117,13 +116,14 @@ class KnowledgeFinder:
 
     def _find_project_root(self) -> Path:
         markers = [".git", "pyproject.toml", "package.json", ".venv"]
-        current = self.file_path.parent
+        current = str(self.file_path.parent)
+        parent = os.path.dirname(current)
 
-        while current != current.parent:
+        while current != parent:
             for marker in markers:
-                if (current / marker).exists():
-                    return current
-            current = current.parent
+                if os.path.exists(os.path.join(current, marker)):
+                    return Path(current)
+            current, parent = parent, os.path.dirname(parent)
 
         return self.file_path.parent
 
@@ -138,128 +138,79 @@ class KnowledgeFinder:
 
         knowledge_infos: list[KnowledgeInfo] = []
         seen_files: set[str] = set()
-        current_dir = self.file_path.parent
+        root_dir = str(self.project_root)
+        current_dir = str(self.file_path.parent)
+        parent_dir = os.path.dirname(current_dir)
         distance = 0
 
-        while current_dir >= self.project_root and current_dir != current_dir.parent:
+        while current_dir != parent_dir:
             # Skip project root as it's automatically read by the system
-            if current_dir != self.project_root:
-                for file in current_dir.iterdir():
-                    if file.is_file() and file.name.lower() in self.KNOWLEDGE_FILES:
-                        try:
-                            relative_path = file.relative_to(self.project_root)
-                            path_str = str(relative_path)
-                        except ValueError:
-                            path_str = str(file)
-
-                        normalized_path = path_str.lower()
-                        if normalized_path not in seen_files:
-                            seen_files.add(normalized_path)
-                            file_type = (
-                                "claude" if "claude" in file.name.lower() else "agents"
-                            )
-
-                            try:
-                                file_content = file.read_bytes()
-                                file_hash = hashlib.sha256(file_content).hexdigest()[
-                                    :16
-                                ]
-                                last_modified = datetime.fromtimestamp(
-                                    file.stat().st_mtime
-                                ).isoformat()
-                            except OSError:
-                                file_hash = "unknown"
-                                last_modified = "unknown"
-
-                            knowledge_infos.append(
-                                KnowledgeInfo(
-                                    path=path_str,
-                                    distance=distance,
-                                    type=file_type,
-                                    hash=file_hash,
-                                    last_modified=last_modified,
-                                )
-                            )
-
-            if current_dir == self.project_root:
-                break
-
-            current_dir = current_dir.parent
-            distance += 1
-
-        return sorted(knowledge_infos, key=lambda x: x["distance"])
-
-
-class KnowledgeInjector:
-    def __init__(self, project_root: Path, transcript_path: str) -> None:
-        self.project_root = project_root
-        self.transcript_path = Path(transcript_path)
-
-    def _has_knowledge_been_read(self, knowledge_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
-
-        try:
-            knowledge_path_str = str(knowledge_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
-
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
-
+            if current_dir != root_dir:
                 try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
+                    with os.scandir(current_dir) as it:
+                        entries = list(it)
+                except OSError:
+                    entries = []
+
+                for entry in entries:
+                    # Matched case-insensitively, so Claude.md or ReadMe.md count too
+                    name_lower = entry.name.lower()
+                    if name_lower not in self.KNOWLEDGE_FILES:
+                        continue
 
-                if not isinstance(entry, dict):
-                    continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        file_stat = entry.stat()
+                    except OSError:
+                        continue
 
-                if entry.get("type") != "assistant":
-                    continue
+                    path_str = os.path.relpath(entry.path, root_dir)
 
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
+                    normalized_path = path_str.lower()
+                    if normalized_path in seen_files:
+                        continue
 
-                if message.get("role") != "assistant":
-                    continue
+                    seen_files.add(normalized_path)
+                    file_type = "claude" if "claude" in name_lower else "agents"
+                    file_hash = f"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"
 
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
+                    knowledge_infos.append(
+                        KnowledgeInfo(
+                            path=path_str,
+                            distance=distance,
+                            type=file_type,
+                            hash=file_hash,
+                        )
+                    )
 
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use":
-                        continue
+            if current_dir == root_dir:
+                break
 
-                    if block.get("name") != "Read":
-                        continue
+            current_dir, parent_dir = parent_dir, os.path.dirname(parent_dir)
+            distance += 1
 
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
+        return knowledge_infos
 
-                    if tool_input.get("file_path") == knowledge_path_str:
-                        return True
 
-            return False
+class KnowledgeInjector:
+    def __init__(self, project_root: Path, transcript_path: str) -> None:
+        self.project_root = project_root
+        self.transcript_path = Path(transcript_path)
+        self._read_paths = load_read_paths(self.transcript_path)
 
-        except OSError:
-            return False
+    def _has_knowledge_been_read(self, knowledge_path: str) -> bool:
+        return canonical_path(knowledge_path) in self._read_paths
 
     def check_and_inject(self, knowledge_info: KnowledgeInfo) -> str:
         path = knowledge_info["path"]
         knowledge_type = knowledge_info["type"]
 
-        full_path = self.project_root / path
-        if not full_path.exists():
+        full_path_str = str(self.project_root / path)
+        if not os.path.exists(full_path_str):
             return ""
 
-        if self._has_knowledge_been_read(full_path):
+        if self._has_knowledge_been_read(full_path_str):
             return ""
 
         file_type_display = knowledge_type.upper()
@@ -267,7 +218,7 @@ class KnowledgeInjector:
         warning_message = (
             f"ACTION REQUIRED: Use Read tool to read {file_type_display} knowledge immediately. READ NOW.\n"
             f"You MUST read the following knowledge file before proceeding:\n"
-            f"{full_path}\n\n"
+            f"{full_path_str}\n\n"
         )
 
         return warning_message
@@ -278,7 +229,7 @@ class HookHandler:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
-            input_raw = sys.stdin.read()
+            input_raw = sys.stdin.buffer.read()
             if not input_raw:
                 print(f"[{hook_filename}] Skipping: No input provided")
                 sys.exit(0)
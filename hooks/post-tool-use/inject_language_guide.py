@@ -9,11 +9,13 @@
 
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
 import orjson
+from transcript_reads import canonical_path, load_read_paths
 
 
 class ReadToolInput(TypedDict):
@@ -99,7 +101,7 @@ class LanguageGuideChecker:
         self.transcript_path = Path(transcript_path)
 
     def _get_guide_path(self, extension: str) -> Path | None:
-        if not extension or not extension.startswith("."):
+        if len(extension) < 2 or not extension.startswith("."):
             return None
 
         guide_filename = f"{extension[1:]}.md"
@@ -119,65 +121,11 @@ class LanguageGuideChecker:
     def _get_guide_identifier(self, guide_content: str, guide_filename: str) -> str:
         return f"[language-guide:{guide_filename}]"
 
-    def _has_guide_been_read(self, guide_path: Path) -> bool:
-        if not self.transcript_path.exists():
-            return False
-
-        try:
-            guide_path_str = str(guide_path)
-            transcript_content = self.transcript_path.read_text(encoding="utf-8")
-
-            for line in transcript_content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry: RawTranscriptEntry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict):
-                    continue
-
-                if entry.get("type") != "assistant":
-                    continue
-
-                message = entry.get("message")
-                if not isinstance(message, dict):
-                    continue
-
-                if message.get("role") != "assistant":
-                    continue
-
-                content = message.get("content")
-                if not isinstance(content, list):
-                    continue
-
-                for block in content:
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use":
-                        continue
-
-                    if block.get("name") != "Read":
-                        continue
-
-                    tool_input = block.get("input")
-                    if not isinstance(tool_input, dict):
-                        continue
-
-                    if tool_input.get("file_path") == guide_path_str:
-                        return True
-
-            return False
-
-        except OSError:
-            return False
+    def _has_guide_been_read(self, guide_path: str) -> bool:
+        return canonical_path(guide_path) in load_read_paths(self.transcript_path)
 
     def check_and_inject(self, file_path: str) -> str:
-        path = Path(file_path)
-        extension = path.suffix
+        extension = os.path.splitext(file_path)[1]
 
         guide_path = self._get_guide_path(extension)
         if not guide_path:
@@ -187,14 +135,14 @@ class LanguageGuideChecker:
         if not guide_content:
             return ""
 
-        if self._has_guide_been_read(guide_path):
+        if self._has_guide_been_read(str(guide_path)):
             return ""
 
         file_extension = extension[1:].upper()
 
         warning_message = (
             f"ACTION REQUIRED: Use Read tool to read guide for {file_extension} immediately. READ NOW."
-            f"You MUST read the following guide before proceeding with {path.name}:\n"
+            f"You MUST read the following guide before proceeding with {os.path.basename(file_path)}:\n"
             f"{guide_path}\n\n"
         )
 
@@ -207,7 +155,7 @@ def main() -> None:
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
     try:
-        input_raw = sys.stdin.read()
+        input_raw = sys.stdin.buffer.read()
         if not input_raw:
             print(f"[{hook_filename}] Skipping: No input provided")
             sys.exit(0)
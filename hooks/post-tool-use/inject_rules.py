@@ -4,7 +4,6 @@
 # dependencies = [
 #     "orjson",
 #     "pyyaml",
-#     "aiofiles",
 #     "wcmatch",
 # ]
 # ///
@@ -13,16 +12,16 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import hashlib
+import os
 import re
 import sys
 from pathlib import Path
-from typing import Any, Literal, NotRequired, TypedDict
+from typing import Any, Literal, NotRequired, TypedDict, cast
 
-import aiofiles
 import orjson
-import yaml
-from wcmatch import glob
+from transcript_reads import TRANSCRIPT_CACHE_DIR, canonical_path, load_read_paths
 
 
 class WriteToolInput(TypedDict):
@@ -73,12 +72,135 @@ class RuleInfo(TypedDict):
     path: Path
     relative_path: str
     distance: int
-    content: str
     content_hash: str
     metadata: RuleMetadata
     match_reason: str
 
 
+FRONTMATTER_PATTERN: re.Pattern[str] = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+FRONTMATTER_KEY_PATTERN: re.Pattern[str] = re.compile(r"^(description|globs|alwaysApply):(?:\s+(.*?))?\s*$")
+FRONTMATTER_LIST_ITEM_PATTERN: re.Pattern[str] = re.compile(r"^\s*-\s+(.*?)\s*$")
+NON_PLAIN_SCALAR_PATTERN: re.Pattern[str] = re.compile(
+    r"^[-?:,\[\]{}#&*!|>%@`'\"=+.\d]|: | #|^(?:~|null|true|false|yes|no|on|off)$", re.IGNORECASE
+)
+FLOW_SEQUENCE_SPECIAL_CHARS = frozenset("[]{}\"'")
+GLOB_MAGIC_PATTERN: re.Pattern[str] = re.compile(r"[*?\[\]]")
+
+RULE_WALK_SKIP_DIRS = frozenset({".git", "node_modules", ".venv"})
+
+RULE_READ_SEMAPHORE = asyncio.Semaphore(16)
+
+
+def _relative_path(path: str, base: str) -> str | None:
+    """String counterpart of Path.relative_to for normalized paths; None when path is not under base."""
+    if path == base:
+        return "."
+
+    prefix = base if base.endswith(os.sep) else base + os.sep
+    return path[len(prefix) :] if path.startswith(prefix) else None
+
+
+@functools.lru_cache(maxsize=4096)
+def _path_exists(path: str) -> bool:
+    return os.path.exists(path)
+
+
+def _content_hash(markdown: str) -> str:
+    # Only used as a dedup fingerprint, so a 64-bit blake2b digest is plenty and cheaper than sha256
+    return hashlib.blake2b(markdown.strip().encode("utf-8"), digest_size=8).hexdigest()
+
+
+async def _read_rule_text(path: str) -> str:
+    # Rules are small; one threaded read_bytes is cheaper than aiofiles' per-operation executor hops
+    async with RULE_READ_SEMAPHORE:
+        data = await asyncio.to_thread(Path(path).read_bytes)
+    return data.decode("utf-8", "replace")
+
+
+class RuleDirListing(TypedDict):
+    dirs: dict[str, int]
+    files: list[str]
+
+
+class RuleDirListingCache:
+    """Persists the rule files under each rule directory, valid while no directory in its tree has changed."""
+
+    CACHE_PATH = TRANSCRIPT_CACHE_DIR / "rule-dir-listings.json"
+
+    def __init__(self) -> None:
+        self._entries: dict[str, RuleDirListing] = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict[str, RuleDirListing]:
+        try:
+            entries = orjson.loads(self.CACHE_PATH.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+        return entries if isinstance(entries, dict) else {}
+
+    def list_rule_files(self, rule_dir: Path) -> list[str]:
+        rule_dir_str = str(rule_dir)
+        listing = self._entries.get(rule_dir_str)
+        if listing is None or not self._is_fresh(listing):
+            listing = self._walk(rule_dir_str)
+            self._entries[rule_dir_str] = listing
+            self._dirty = True
+
+        return listing["files"]
+
+    @staticmethod
+    def _is_fresh(listing: RuleDirListing) -> bool:
+        # Adding, removing or renaming an entry bumps the mtime of the directory holding it
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime_ns for path, mtime_ns in listing["dirs"].items())
+        except OSError:
+            return False
+
+    @staticmethod
+    def _walk(rule_dir_str: str) -> RuleDirListing:
+        dirs: dict[str, int] = {}
+        mdc_files: list[str] = []
+        md_files: list[str] = []
+
+        try:
+            stack = [(rule_dir_str, os.stat(rule_dir_str).st_mtime_ns)]
+        except OSError:
+            stack = []
+
+        while stack:
+            dirpath, mtime_ns = stack.pop()
+            try:
+                with os.scandir(dirpath) as entries:
+                    # DirEntry type checks reuse the type readdir reported, so plain entries cost no extra stat
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in RULE_WALK_SKIP_DIRS:
+                                stack.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                        elif entry.name.endswith(".mdc") and entry.is_file():
+                            mdc_files.append(entry.path)
+                        elif entry.name.endswith(".md") and entry.is_file():
+                            md_files.append(entry.path)
+            except OSError:
+                continue
+
+            dirs[dirpath] = mtime_ns
+
+        return RuleDirListing(dirs=dirs, files=mdc_files + md_files)
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        try:
+            self.CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(self._entries))
+            os.replace(tmp_path, self.CACHE_PATH)
+        except OSError:
+            pass
+
+
 class RuleFinder:
     def __init__(self, cwd: Path) -> None:
         self.cwd = cwd
@@ -97,65 +219,145 @@ class RuleFinder:
 
         return self.cwd
 
-    def find_rule_files(self, current_file_path: Path) -> list[tuple[Path, int]]:
-        candidates: list[tuple[Path, int]] = []
+    def find_rule_files(self, current_file_path: Path) -> list[tuple[str, int]]:
+        candidates: list[tuple[str, int]] = []
+        project_root_str = str(self.project_root)
+        current_file_str = str(current_file_path)
+
+        in_project = _relative_path(current_file_str, project_root_str) is not None
+
+        user_rules_exist = self.user_rules_dir.exists()
+        if not in_project and not user_rules_exist:
+            return []
 
         project_rule_dirs = [
-            self.project_root / ".cursor" / "rules",
-            self.project_root / ".claude" / "modular-prompts",
+            rule_dir
+            for rule_dir in (self.project_root / ".cursor" / "rules", self.project_root / ".claude" / "modular-prompts")
+            if rule_dir.exists()
         ]
+        if not project_rule_dirs and not user_rules_exist:
+            return []
 
-        for rule_dir in project_rule_dirs:
-            if not rule_dir.exists():
-                continue
-
-            for pattern in ["**/*.mdc", "**/*.md"]:
-                for rule_file in rule_dir.glob(pattern):
-                    if rule_file.is_file():
-                        distance = self._calculate_distance(rule_file, current_file_path)
-                        candidates.append((rule_file, distance))
+        listing_cache = RuleDirListingCache()
 
-        if self.user_rules_dir.exists():
-            for pattern in ["**/*.mdc", "**/*.md"]:
-                for rule_file in self.user_rules_dir.glob(pattern):
-                    if rule_file.is_file():
-                        candidates.append((rule_file, 9999))
+        current_rel = _relative_path(os.path.dirname(current_file_str), project_root_str)
+        current_parts = None if current_rel is None else self._split_parts(current_rel)
 
+        # Rules sharing a directory share a distance, so it is computed once per directory
+        distance_by_dir: dict[str, int] = {}
+        for rule_dir in project_rule_dirs:
+            for rule_file in listing_cache.list_rule_files(rule_dir):
+                rule_file_dir = os.path.dirname(rule_file)
+                distance = distance_by_dir.get(rule_file_dir)
+                if distance is None:
+                    distance = self._calculate_distance(rule_file_dir, project_root_str, current_parts)
+                    distance_by_dir[rule_file_dir] = distance
+                candidates.append((rule_file, distance))
+
+        if user_rules_exist:
+            for rule_file in listing_cache.list_rule_files(self.user_rules_dir):
+                candidates.append((rule_file, 9999))
+
+        listing_cache.save()
         candidates.sort(key=lambda x: x[1])
 
         return candidates
 
-    def _calculate_distance(self, rule_file: Path, current_file: Path) -> int:
-        try:
-            rule_dir = rule_file.parent
-            current_dir = current_file.parent
-
-            rule_rel = rule_dir.relative_to(self.project_root)
-            current_rel = current_dir.relative_to(self.project_root)
+    @staticmethod
+    def _split_parts(relative_path: str) -> list[str]:
+        return [] if relative_path == "." else relative_path.split(os.sep)
 
-            rule_parts = rule_rel.parts
-            current_parts = current_rel.parts
+    def _calculate_distance(self, rule_dir: str, project_root_str: str, current_parts: list[str] | None) -> int:
+        if current_parts is None:
+            return 9999
 
-            common = 0
-            for r, c in zip(rule_parts, current_parts):
-                if r == c:
-                    common += 1
-                else:
-                    break
+        rule_rel = _relative_path(rule_dir, project_root_str)
+        if rule_rel is None:
+            return 9999
 
-            distance = len(current_parts) - common
+        rule_parts = self._split_parts(rule_rel)
 
-            return distance
+        common = 0
+        for r, c in zip(rule_parts, current_parts):
+            if r == c:
+                common += 1
+            else:
+                break
 
-        except ValueError:
-            return 9999
+        return len(current_parts) - common
 
 
 class RuleParser:
+    @staticmethod
+    def _parse_scalar(value: str) -> str | None:
+        """Parse a plain or simply quoted scalar; None means the value needs the full YAML parser."""
+        if len(value) >= 2 and value[0] == value[-1] == '"' and "\\" not in value and '"' not in value[1:-1]:
+            return value[1:-1]
+        if len(value) >= 2 and value[0] == value[-1] == "'" and "'" not in value[1:-1]:
+            return value[1:-1]
+        if not value or NON_PLAIN_SCALAR_PATTERN.search(value):
+            return None
+        return value
+
+    @staticmethod
+    def _parse_simple_frontmatter(yaml_str: str) -> dict[str, Any] | None:
+        """Parse the `description`/`globs`/`alwaysApply` subset rule files use; None on anything else."""
+        metadata: dict[str, Any] = {}
+        list_key: str | None = None
+
+        for line in yaml_str.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+
+            if list_key is not None:
+                item_match = FRONTMATTER_LIST_ITEM_PATTERN.match(line)
+                if item_match:
+                    item = RuleParser._parse_scalar(item_match.group(1))
+                    if item is None:
+                        return None
+                    metadata[list_key].append(item)
+                    continue
+                if metadata[list_key] == []:
+                    metadata[list_key] = None
+                list_key = None
+
+            key_match = FRONTMATTER_KEY_PATTERN.match(line)
+            if not key_match or key_match.group(1) in metadata:
+                return None
+
+            key, value = key_match.group(1), key_match.group(2) or ""
+            if not value:
+                metadata[key] = []
+                list_key = key
+            elif key == "alwaysApply":
+                if value.lower() not in ("true", "false"):
+                    return None
+                metadata[key] = value.lower() == "true"
+            elif value.startswith("[") and value.endswith("]"):
+                if not FLOW_SEQUENCE_SPECIAL_CHARS.isdisjoint(value[1:-1]):
+                    return None
+                items = [RuleParser._parse_scalar(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+                if any(item is None for item in items):
+                    return None
+                metadata[key] = items
+            else:
+                scalar = RuleParser._parse_scalar(value)
+                if scalar is None:
+                    return None
+                metadata[key] = scalar
+
+        if list_key is not None and metadata[list_key] == []:
+            metadata[list_key] = None
+
+        return metadata
+
     @staticmethod
     def parse_frontmatter(content: str) -> tuple[RuleMetadata, str]:
-        pattern = r"^---\s*\n(.*?)\n---\s*\n(.*)$"
-        match = re.match(pattern, content, re.DOTALL)
+        if not content.startswith("---"):
+            return RuleMetadata(), content
+
+        match = FRONTMATTER_PATTERN.match(content)
 
         if not match:
             return RuleMetadata(), content
@@ -163,20 +365,57 @@ class RuleParser:
         yaml_str = match.group(1)
         markdown = match.group(2)
 
-        try:
-            metadata = yaml.safe_load(yaml_str) or {}
-        except yaml.YAMLError:
-            metadata = {}
+        metadata = RuleParser._parse_simple_frontmatter(yaml_str)
+        if metadata is None:
+            # Anything beyond the simple subset (anchors, block scalars, odd keys) goes through PyYAML
+            import yaml
+
+            try:
+                metadata = yaml.safe_load(yaml_str) or {}
+            except yaml.YAMLError:
+                metadata = {}
 
         if "globs" in metadata and isinstance(metadata["globs"], str):
             metadata["globs"] = [g.strip() for g in metadata["globs"].split(",") if g.strip()]
 
-        return RuleMetadata(**metadata), markdown
+        return RuleMetadata(**cast(RuleMetadata, metadata)), markdown
+
+
+@functools.lru_cache(maxsize=256)
+def _translate_globs(globs: tuple[str, ...]) -> str:
+    """Fuse a rule's globs into one regex source whose `gN` group names the glob that matched."""
+    # Translated sources are persisted in the rule cache, so wcmatch is only imported when a rule changes
+    from wcmatch import glob
+
+    alternatives = [
+        f"(?P<g{index}>{'|'.join(glob.translate(pattern, flags=glob.GLOBSTAR)[0])})"
+        for index, pattern in enumerate(globs)
+    ]
+    return "|".join(alternatives)
+
+
+@functools.lru_cache(maxsize=256)
+def _glob_affixes(globs: tuple[str, ...]) -> tuple[tuple[str, str], ...] | None:
+    """Literal (prefix, suffix) each glob's matches must carry; None when some glob can't be prefiltered."""
+    affixes: list[tuple[str, str]] = []
+    for pattern in globs:
+        if "\\" in pattern or pattern.startswith(("./", "/")) or pattern.endswith("/"):
+            return None
+
+        magic = [m.start() for m in GLOB_MAGIC_PATTERN.finditer(pattern)]
+        if not magic:
+            affixes.append((pattern, pattern))
+        else:
+            affixes.append((pattern[: magic[0]], pattern[magic[-1] + 1 :]))
+
+    return tuple(affixes)
 
 
 class RuleMatcher:
     @staticmethod
-    def should_apply(rule_metadata: RuleMetadata, current_file_path: Path, cwd: Path) -> str | None:
+    def should_apply(
+        rule_metadata: RuleMetadata, current_file_path: Path, cwd: Path, globs_re: str | None = None
+    ) -> str | None:
         if rule_metadata.get("alwaysApply"):
             return "alwaysApply"
 
@@ -184,22 +423,102 @@ class RuleMatcher:
         if not globs:
             return None
 
-        try:
-            relative_path = current_file_path.relative_to(cwd)
-        except ValueError:
+        relative_path_str = _relative_path(str(current_file_path), str(cwd))
+        if relative_path_str is None:
             return None
 
-        relative_path_str = str(relative_path)
-        for glob_pattern in globs:
-            if glob.globmatch(relative_path_str, glob_pattern, flags=glob.GLOBSTAR):
-                return f"glob: {glob_pattern}"
+        # Most rules target other directories or extensions; a literal prefix/suffix check rejects them before the regex
+        affixes = _glob_affixes(tuple(globs))
+        if affixes is not None and not any(
+            relative_path_str.startswith(prefix) and relative_path_str.endswith(suffix) for prefix, suffix in affixes
+        ):
+            return None
 
+        match = re.compile(globs_re or _translate_globs(tuple(globs))).match(relative_path_str)
+        if match and match.lastgroup:
+            return f"glob: {globs[int(match.lastgroup[1:])]}"
+
+        return None
+
+
+class RuleHashEntry(TypedDict):
+    mtime_ns: int
+    size: int
+    hash: str
+    metadata: NotRequired[RuleMetadata]
+    globs_re: NotRequired[str | None]
+
+
+class RuleHashCache:
+    """
+    Persists rule body hashes, frontmatter and translated globs keyed by realpath,
+    valid while the file's mtime and size are unchanged.
+    """
+
+    # Bump the file name whenever _content_hash changes so stale digests are never compared with new ones
+    CACHE_PATH = TRANSCRIPT_CACHE_DIR / "rule-hashes-v2.json"
+
+    def __init__(self) -> None:
+        self._entries: dict[str, RuleHashEntry] = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict[str, RuleHashEntry]:
+        try:
+            entries = orjson.loads(self.CACHE_PATH.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+
+        return entries if isinstance(entries, dict) else {}
+
+    def get_entry(self, real_path_str: str, stat: os.stat_result) -> RuleHashEntry | None:
+        entry = self._entries.get(real_path_str)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
         return None
 
+    def get(self, real_path_str: str, stat: os.stat_result) -> str | None:
+        entry = self.get_entry(real_path_str, stat)
+        return entry["hash"] if entry else None
+
+    def put(
+        self,
+        real_path_str: str,
+        stat: os.stat_result,
+        content_hash: str,
+        metadata: RuleMetadata,
+    ) -> RuleHashEntry:
+        globs = metadata.get("globs")
+        if not (isinstance(globs, list) and all(isinstance(g, str) for g in globs)):
+            globs = None
+
+        entry = RuleHashEntry(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            hash=content_hash,
+            metadata=metadata,
+            globs_re=_translate_globs(tuple(globs)) if globs else None,
+        )
+        self._entries[real_path_str] = entry
+        self._dirty = True
+        return entry
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+
+        try:
+            self.CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(self._entries))
+            os.replace(tmp_path, self.CACHE_PATH)
+        except (OSError, TypeError):
+            pass
+
 
 class TranscriptAnalyzer:
-    def __init__(self, transcript_path: Path) -> None:
+    def __init__(self, transcript_path: Path, hash_cache: RuleHashCache) -> None:
         self.transcript_path = transcript_path
+        self.hash_cache = hash_cache
         self._read_contents_cache: tuple[dict[str, str], set[str]] | None = None
 
     async def get_already_read_rule_contents(self) -> tuple[dict[str, str], set[str]]:
@@ -211,104 +530,74 @@ class TranscriptAnalyzer:
         if self._read_contents_cache is not None:
             return self._read_contents_cache
 
-        if not self.transcript_path.exists():
-            self._read_contents_cache = ({}, set())
-            return ({}, set())
-
         read_files: dict[str, str] = {}
         read_hashes: set[str] = set()
 
-        try:
-            async with aiofiles.open(self.transcript_path, encoding="utf-8") as f:
-                content = await f.read()
-
-            for line in content.splitlines():
-                if not line.strip():
-                    continue
-
-                try:
-                    entry = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if not isinstance(entry, dict) or entry.get("type") != "assistant":
-                    continue
-
-                message = entry.get("message", {})
-                if message.get("role") != "assistant":
-                    continue
-
-                for block in message.get("content", []):
-                    if not isinstance(block, dict):
-                        continue
-
-                    if block.get("type") != "tool_use" or block.get("name") != "Read":
-                        continue
-
-                    tool_input = block.get("input", {})
-                    file_path = tool_input.get("file_path")
-
-                    if not file_path:
-                        continue
-
-                    if not (file_path.endswith(".md") or file_path.endswith(".mdc")):
-                        continue
-
-                    try:
-                        path = Path(file_path)
-                        if path.exists():
-                            real_path = path.resolve()
-                            content_hash = await self._hash_file_content(real_path)
-                            read_files[str(real_path)] = content_hash
-                            read_hashes.add(content_hash)
-                    except OSError:
-                        pass
+        for file_path in load_read_paths(self.transcript_path):
+            if not (file_path.endswith(".md") or file_path.endswith(".mdc")):
+                continue
 
-        except OSError:
-            pass
+            try:
+                if _path_exists(file_path):
+                    real_path_str = canonical_path(file_path)
+                    content_hash = await self._hash_file_content(real_path_str)
+                    read_files[real_path_str] = content_hash
+                    read_hashes.add(content_hash)
+            except OSError:
+                pass
 
         self._read_contents_cache = (read_files, read_hashes)
         return (read_files, read_hashes)
 
-    @staticmethod
-    async def _hash_file_content(file_path: Path) -> str:
+    async def _hash_file_content(self, file_path: str) -> str:
         try:
-            async with aiofiles.open(file_path, encoding="utf-8") as f:
-                content = await f.read()
+            stat = os.stat(file_path)
+            cached_hash = self.hash_cache.get(file_path, stat)
+            if cached_hash is not None:
+                return cached_hash
 
-            _, markdown = RuleParser.parse_frontmatter(content)
-            stripped = markdown.strip()
-            return hashlib.sha256(stripped.encode("utf-8")).hexdigest()[:16]
+            content = await _read_rule_text(file_path)
+
+            metadata, markdown = RuleParser.parse_frontmatter(content)
+            content_hash = _content_hash(markdown)
+            self.hash_cache.put(file_path, stat, content_hash, metadata)
+            return content_hash
         except OSError:
             return "error"
 
 
 async def process_single_rule_file(
-    rule_path: Path,
+    rule_path: str,
     distance: int,
     current_file_path: Path,
     cwd: Path,
     already_read_contents: tuple[dict[str, str], set[str]],
+    hash_cache: RuleHashCache,
 ) -> RuleInfo | None:
     try:
-        async with aiofiles.open(rule_path, encoding="utf-8") as f:
-            content = await f.read()
+        real_rule_path_str = canonical_path(rule_path)
+        rule_stat = os.stat(real_rule_path_str)
+
+        # An unchanged rule is matched from its cached frontmatter without reading the file
+        entry = hash_cache.get_entry(real_rule_path_str, rule_stat)
+        if entry is None or "metadata" not in entry:
+            content = await _read_rule_text(rule_path)
 
-        metadata, markdown = RuleParser.parse_frontmatter(content)
+            metadata, markdown = RuleParser.parse_frontmatter(content)
+            content_hash = _content_hash(markdown)
+            entry = hash_cache.put(real_rule_path_str, rule_stat, content_hash, metadata)
+
+        metadata = entry["metadata"]
+        content_hash = entry["hash"]
 
         matcher = RuleMatcher()
-        match_reason = matcher.should_apply(metadata, current_file_path, cwd)
+        match_reason = matcher.should_apply(metadata, current_file_path, cwd, entry.get("globs_re"))
 
         if not match_reason:
             return None
 
-        content_hash = hashlib.sha256(markdown.strip().encode("utf-8")).hexdigest()[:16]
-
         already_read_paths, already_read_hashes = already_read_contents
 
-        real_rule_path = rule_path.resolve()
-        real_rule_path_str = str(real_rule_path)
-
         if real_rule_path_str in already_read_paths:
             if already_read_paths[real_rule_path_str] == content_hash:
                 return None
@@ -316,16 +605,14 @@ async def process_single_rule_file(
         if content_hash in already_read_hashes:
             return None
 
-        try:
-            relative_path = str(rule_path.relative_to(cwd))
-        except ValueError:
-            relative_path = str(rule_path)
+        relative_path = _relative_path(rule_path, str(cwd))
+        if relative_path is None:
+            relative_path = rule_path
 
         return RuleInfo(
-            path=rule_path,
+            path=Path(rule_path),
             relative_path=relative_path,
             distance=distance,
-            content=content,
             content_hash=content_hash,
             metadata=metadata,
             match_reason=match_reason,
@@ -340,6 +627,9 @@ class RuleInjector:
 
     def __init__(self, session_id: str) -> None:
         self.session_id = session_id
+        self.todo_file = self.TODOS_DIR / f"{session_id}-agent-{session_id}.json"
+        self._pending_todos: list[dict[str, str]] = []
+        self._pending_completions: set[str] = set()
 
     def _generate_todo_id(self, rule_info: RuleInfo) -> str:
         safe_path = rule_info["relative_path"].replace("/", "-").replace(".", "-")
@@ -354,63 +644,89 @@ class RuleInjector:
         return f"read-rule-{safe_path}"
 
     def _mark_todo_completed(self, todo_id: str) -> None:
-        self.TODOS_DIR.mkdir(parents=True, exist_ok=True)
-        todo_file = self.TODOS_DIR / f"{self.session_id}-agent-{self.session_id}.json"
+        self._pending_completions.add(todo_id)
 
-        if not todo_file.exists():
-            return
+    def add_todo_item(self, rule_info: RuleInfo) -> None:
+        self._pending_todos.append(
+            {
+                "content": f"Read rule: {rule_info['path']} ({rule_info['match_reason']})",
+                "status": "pending",
+                "priority": "high",
+                "id": self._generate_todo_id(rule_info),
+            }
+        )
 
-        try:
-            todos = orjson.loads(todo_file.read_bytes())
-        except (orjson.JSONDecodeError, OSError):
+    def flush(self) -> None:
+        """Apply every buffered completion and new todo with a single read-modify-write of the todo file."""
+        if not self._pending_todos and not self._pending_completions:
             return
 
-        for todo in todos:
-            if todo.get("id") == todo_id:
-                if todo.get("status") != "completed":
-                    todo["status"] = "completed"
-                break
-
         try:
-            todo_file.write_bytes(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
-        except OSError:
-            pass
-
-    def add_todo_item(self, rule_info: RuleInfo) -> None:
-        self.TODOS_DIR.mkdir(parents=True, exist_ok=True)
-        todo_file = self.TODOS_DIR / f"{self.session_id}-agent-{self.session_id}.json"
-
-        try:
-            if todo_file.exists():
-                todos = orjson.loads(todo_file.read_bytes())
-            else:
-                todos = []
+            todos = orjson.loads(self.todo_file.read_bytes())
+        except FileNotFoundError:
+            todos = []
         except (orjson.JSONDecodeError, OSError):
+            # Completions alone never overwrite a todo file we could not read
+            if not self._pending_todos:
+                return
             todos = []
 
-        todo_id = self._generate_todo_id(rule_info)
+        changed = False
+        for todo in todos:
+            if todo.get("id") in self._pending_completions and todo.get("status") != "completed":
+                todo["status"] = "completed"
+                changed = True
 
-        for existing in todos:
-            if existing.get("id") == todo_id:
-                return
+        existing_ids = {todo.get("id") for todo in todos}
+        for todo_item in self._pending_todos:
+            if todo_item["id"] in existing_ids:
+                continue
+            todos.insert(0, todo_item)
+            existing_ids.add(todo_item["id"])
+            changed = True
 
-        todo_item = {
-            "content": f"Read rule: {rule_info['path']} ({rule_info['match_reason']})",
-            "status": "pending",
-            "priority": "high",
-            "id": todo_id,
-        }
+        self._pending_todos.clear()
+        self._pending_completions.clear()
 
-        todos.insert(0, todo_item)
+        if not changed:
+            return
 
         try:
-            todo_file.write_bytes(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
+            self.TODOS_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.todo_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(orjson.dumps(todos, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, self.todo_file)
         except OSError:
             pass
 
 
 class HookHandler:
-    async def handle(self) -> None:
+    async def _process_rules(
+        self,
+        rule_candidates: list[tuple[str, int]],
+        transcript_path: Path,
+        current_file_path: Path,
+        cwd: Path,
+        hash_cache: RuleHashCache,
+    ) -> list[RuleInfo | BaseException | None]:
+        analyzer = TranscriptAnalyzer(transcript_path, hash_cache)
+        already_read = await analyzer.get_already_read_rule_contents()
+
+        # A lone rule gains nothing from task scheduling
+        if len(rule_candidates) == 1:
+            rule_path, distance = rule_candidates[0]
+            return [
+                await process_single_rule_file(rule_path, distance, current_file_path, cwd, already_read, hash_cache)
+            ]
+
+        tasks = [
+            process_single_rule_file(rule_path, distance, current_file_path, cwd, already_read, hash_cache)
+            for rule_path, distance in rule_candidates
+        ]
+
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def handle(self) -> None:
         hook_filename = Path(__file__).stem.replace("_", "-")
 
         try:
@@ -466,6 +782,7 @@ class HookHandler:
                     injector = RuleInjector(session_id)
                     todo_id = injector._generate_todo_id_from_path(current_file_path, finder.project_root)
                     injector._mark_todo_completed(todo_id)
+                    injector.flush()
 
                     print(f"[{hook_filename}] Success: Rule todo completed")
                     sys.exit(0)
@@ -480,23 +797,30 @@ class HookHandler:
             print(f"[{hook_filename}] Success: No rule files found")
             sys.exit(0)
 
-        analyzer = TranscriptAnalyzer(transcript_path)
-        already_read = await analyzer.get_already_read_rule_contents()
-
-        tasks = [
-            process_single_rule_file(rule_path, distance, current_file_path, cwd, already_read)
-            for rule_path, distance in rule_candidates
-        ]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # The same rule can be reachable from several rule dirs via symlinks; keep its closest occurrence
+        seen_rule_paths: set[str] = set()
+        unique_candidates: list[tuple[str, int]] = []
+        for rule_path, distance in rule_candidates:
+            real_rule_path_str = canonical_path(rule_path)
+            if real_rule_path_str not in seen_rule_paths:
+                seen_rule_paths.add(real_rule_path_str)
+                unique_candidates.append((rule_path, distance))
+
+        # The event loop is only started once there is at least one rule to read
+        hash_cache = RuleHashCache()
+        results = asyncio.run(
+            self._process_rules(unique_candidates, transcript_path, current_file_path, cwd, hash_cache)
+        )
+        hash_cache.save()
 
         rules_to_inject: list[RuleInfo] = []
         for result in results:
-            if isinstance(result, Exception):
+            # gather(return_exceptions=True) also hands back CancelledError, which is not an Exception
+            if isinstance(result, BaseException):
                 continue
             if result is None:
                 continue
-            rules_to_inject.append(result)  # pyright: ignore[reportArgumentType]
+            rules_to_inject.append(result)
 
         if not rules_to_inject:
             print(f"[{hook_filename}] Success: All rules already in context")
@@ -519,18 +843,19 @@ class HookHandler:
             )
             messages.append(message)
 
+        injector.flush()
         combined_message = "\n\n".join(messages)
         print(combined_message, file=sys.stderr)
         sys.exit(2)
 
 
-async def main() -> None:
+def main() -> None:
     hook_filename = Path(__file__).stem.replace("_", "-")
     print(f"\n[{hook_filename}]", file=sys.stderr)
 
     handler = HookHandler()
-    await handler.handle()
+    handler.handle()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
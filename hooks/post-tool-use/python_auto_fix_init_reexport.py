@@ -3,6 +3,7 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #   "ast-grep-py>=0.24.1",
+#   "orjson",
 # ]
 # ///
 """
@@ -12,15 +13,28 @@ Automatically converts 'from X import Y' to 'from X import Y as Y' for items in
 
 from __future__ import annotations
 
-import json
+import functools
 import re
 import sys
 from pathlib import Path
 from typing import Any, NoReturn, TypedDict
 
 import ast_grep_py as sg  # type: ignore[import-not-found]  # pyright: ignore[reportMissingImports]
+import orjson  # type: ignore[import-not-found]  # pyright: ignore[reportMissingImports]
 
 EXIT_CODE_BLOCK_TOOL: int = 2
+ALL_ASSIGNMENT_AST_PATTERN: str = "__all__ = $VALUE"
+BLANK_LINE_RUN_PATTERN: re.Pattern[str] = re.compile(r"\n{3,}")
+FROM_IMPORT_PATTERN: re.Pattern[str] = re.compile(
+    r"^([^\S\n]*from [^\S\n]*[\w\.]+[^\S\n]+import[^\S\n]+)(.+)$", re.MULTILINE
+)
+REEXPORT_PATTERN: re.Pattern[str] = re.compile(
+    r"from\s+[\w\.]+\s+import\s+([\w\s,]+(?:\s+as\s+\w+)?(?:\s*,\s*\w+\s+as\s+\w+)*)"
+)
+ALL_ASSIGNMENT_PATTERN: re.Pattern[str] = re.compile(r"__all__\s*=\s*[\[\(]([^\]\)]+)[\]\)]", re.DOTALL)
+QUOTED_ITEM_PATTERN: re.Pattern[str] = re.compile(r'["\']([^"\']+)["\']')
+# Hook files, test directories, *_test.py, and any file whose name contains "test_"
+EXCLUDED_PATH_PATTERN: re.Pattern[str] = re.compile(r"/hooks/|/tests?/|_test\.py$|test_[^/]*$")
 
 
 class EditOperation(TypedDict):
@@ -75,15 +89,15 @@ def main() -> None:
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: bytes = sys.stdin.buffer.read()
     if not input_raw:
         print("[auto-fix-init-reexport] Skipping: No input provided")
         sys.exit(0)
 
     try:
-        parsed_data: PostToolUseInput = json.loads(input_raw)
+        parsed_data: PostToolUseInput = orjson.loads(input_raw)
         return parsed_data
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (orjson.JSONDecodeError, KeyError, TypeError):
         print("[auto-fix-init-reexport] Skipping: Invalid input format")
         sys.exit(0)
 
@@ -91,9 +105,22 @@ def parse_input() -> PostToolUseInput:
 def should_process(data: PostToolUseInput) -> bool:
     """Determine if the input should be processed."""
     tool_input = data["tool_input"]  # type: ignore[assignment]
-    tool_response = data["tool_response"]
+    if not isinstance(tool_input, dict):
+        return False
+
+    # Most edits are rejected by path alone, before the tool response is inspected
+    file_path: str = ""
+    if "file_path" in tool_input:
+        file_path = tool_input["file_path"]  # type: ignore[literal-required]
 
-    if not isinstance(tool_input, dict) or not isinstance(tool_response, dict):
+    if not file_path or not file_path.endswith("__init__.py"):
+        return False
+
+    if _is_excluded_path(file_path):
+        return False
+
+    tool_response = data["tool_response"]
+    if not isinstance(tool_response, dict):
         return False
 
     success = tool_response.get("success")
@@ -107,18 +134,7 @@ def should_process(data: PostToolUseInput) -> bool:
             case _:
                 success = False
 
-    if not success:
-        return False
-
-    file_path: str = ""
-    if "file_path" in tool_input:
-        file_path = tool_input["file_path"]  # type: ignore[literal-required]
-
-    if not file_path or not file_path.endswith("__init__.py"):
-        return False
-
-    excluded: bool = _is_excluded_path(file_path)
-    return not excluded
+    return bool(success)
 
 
 def process_and_fix(data: PostToolUseInput) -> bool:
@@ -129,12 +145,21 @@ def process_and_fix(data: PostToolUseInput) -> bool:
     if "file_path" in tool_input:
         file_path = tool_input["file_path"]  # type: ignore[literal-required]
 
-    if not file_path or not Path(file_path).exists():
+    if not file_path:
         return False
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            original_content = f.read()
+        with open(file_path, "rb") as f:
+            original_bytes = f.read()
+
+        # Reject files without __all__ before decoding them
+        if b"__all__" not in original_bytes:
+            return False
+
+        original_content = original_bytes.decode("utf-8")
+        if "\r" in original_content:
+            # Same universal-newline translation the previous text-mode read applied
+            original_content = original_content.replace("\r\n", "\n").replace("\r", "\n")
 
         fixed_content = _auto_fix_implicit_imports(original_content)
 
@@ -188,22 +213,15 @@ def _handle_hook_error() -> NoReturn:
 
 def _is_excluded_path(file_path: str) -> bool:
     """Check if file path should be excluded from processing."""
-    if "/hooks/" in file_path:
-        return True
-
-    if (
-        "/test/" in file_path
-        or "/tests/" in file_path
-        or file_path.endswith("_test.py")
-        or "test_" in Path(file_path).name
-    ):
-        return True
-
-    return False
+    return EXCLUDED_PATH_PATTERN.search(file_path) is not None
 
 
 def _auto_fix_implicit_imports(code: str) -> str:
     """Auto-fix implicit imports to explicit re-exports."""
+    # Most __init__.py files have no __all__; skip parsing them
+    if "__all__" not in code:
+        return code
+
     all_items = _extract_all_items_from_code(code)
     if not all_items:
         return code
@@ -211,39 +229,42 @@ def _auto_fix_implicit_imports(code: str) -> str:
     explicit_reexports = _find_explicit_reexports(code)
     missing_items = [item for item in all_items if item not in explicit_reexports]
 
-    fixed_code = code
-    for item in missing_items:
-        updated_code = _convert_import_to_explicit_reexport(fixed_code, item)
-        fixed_code = updated_code
+    fixed_code, converted_items = _convert_imports_to_explicit_reexports(code, missing_items)
 
-    updated_explicit_reexports = _find_explicit_reexports(fixed_code)
-    if all(item in updated_explicit_reexports for item in all_items):
+    # Files that were already fully explicit are left alone; __all__ is only dropped once this run converted imports
+    if converted_items and set(all_items) <= _find_explicit_reexports(fixed_code):
         fixed_code = _remove_all_assignment(fixed_code)
 
     return fixed_code
 
 
+@functools.lru_cache(maxsize=32)
+def _parse(code: str) -> sg.SgRoot:
+    """Parse code with ast-grep, reusing the tree when the fix pass left the code unchanged."""
+    return sg.SgRoot(code, "python")
+
+
 def _remove_all_assignment(code: str) -> str:
     """Remove the __all__ assignment when explicit re-exports are present."""
-    root: sg.SgRoot = sg.SgRoot(code, "python")
-    assignment: sg.SgNode | None = root.root().find(pattern="__all__ = $VALUE")
+    root: sg.SgRoot = _parse(code)
+    assignment: sg.SgNode | None = root.root().find(pattern=ALL_ASSIGNMENT_AST_PATTERN)
     if assignment is None:
         return code
 
     target = assignment.text()
     updated = code.replace(target, "", 1)
-    while "\n\n\n" in updated:
-        updated = updated.replace("\n\n\n", "\n\n")
-
-    return updated
+    return BLANK_LINE_RUN_PATTERN.sub("\n\n", updated)
 
 
 def _extract_all_items_from_code(code: str) -> list[str]:
     """Extract items from __all__ assignment using ast-grep."""
-    root: sg.SgRoot = sg.SgRoot(code, "python")
+    if "__all__" not in code:
+        return []
+
+    root: sg.SgRoot = _parse(code)
     node: sg.SgNode = root.root()
 
-    all_assignments: list[sg.SgNode] = node.find_all(pattern="__all__ = $VALUE")
+    all_assignments: list[sg.SgNode] = node.find_all(pattern=ALL_ASSIGNMENT_AST_PATTERN)
 
     for assignment in all_assignments:
         text = assignment.text()
@@ -256,12 +277,12 @@ def _extract_all_items_from_code(code: str) -> list[str]:
 
 def _extract_items_from_all_text(text: str) -> list[str]:
     """Extract items from __all__ text."""
-    match = re.search(r"__all__\s*=\s*[\[\(]([^\]\)]+)[\]\)]", text, re.DOTALL)
+    match = ALL_ASSIGNMENT_PATTERN.search(text)
     if not match:
         return []
 
     items_str = match.group(1)
-    items = re.findall(r'["\']([^"\']+)["\']', items_str)
+    items = QUOTED_ITEM_PATTERN.findall(items_str)
     return items
 
 
@@ -269,10 +290,7 @@ def _find_explicit_reexports(code: str) -> set[str]:
     """Find all explicit re-exports (from X import Y as Y) in the code."""
     explicit_reexports: set[str] = set()
 
-    pattern = r"from\s+[\w\.]+\s+import\s+([\w\s,]+(?:\s+as\s+\w+)?(?:\s*,\s*\w+\s+as\s+\w+)*)"
-    matches = re.findall(pattern, code)
-
-    for match in matches:
+    for match in REEXPORT_PATTERN.findall(code):
         items = [item.strip() for item in match.split(",")]
         for item in items:
             if " as " in item:
@@ -286,55 +304,49 @@ def _find_explicit_reexports(code: str) -> set[str]:
     return explicit_reexports
 
 
-def _convert_import_to_explicit_reexport(code: str, item: str) -> str:
-    """Convert a single import to explicit re-export format."""
-    lines = code.split("\n")
-    modified = False
-    insert_position = -1
+def _convert_imports_to_explicit_reexports(code: str, items: list[str]) -> tuple[str, set[str]]:
+    """Convert the first bare import of each item to explicit re-export format in a single scan of the code.
 
-    for i, line in enumerate(lines):
-        if modified:
-            break
-
-        if not line.strip().startswith("from "):
-            continue
+    Returns the updated code and the items that were converted.
+    """
+    pending: dict[str, int] = {item: index for index, item in enumerate(items)}
+    converted: set[str] = set()
+    pieces: list[str] = []
+    last_end = 0
 
-        match = re.match(r"^(\s*from\s+([\w\.]+)\s+import\s+)(.+)$", line)
-        if not match:
-            continue
+    for match in FROM_IMPORT_PATTERN.finditer(code):
+        if not pending:
+            break
 
         indent = match.group(1)
-        match.group(2)
-        imports_part = match.group(3)
+        imports_part = match.group(2)
 
-        import_items = [x.strip() for x in imports_part.split(",")]
-        remaining_items = []
-        item_found = False
+        converted_items: list[str] = []
+        remaining_items: list[str] = []
 
-        for import_item in import_items:
-            if " as " in import_item:
-                remaining_items.append(import_item)
-            elif import_item == item:
-                item_found = True
-                insert_position = i
+        for import_item in (x.strip() for x in imports_part.split(",")):
+            if " as " not in import_item and import_item in pending:
+                converted_items.append(import_item)
             else:
                 remaining_items.append(import_item)
 
-        if item_found:
-            if remaining_items:
-                lines[i] = indent + ", ".join(remaining_items)
-            else:
-                lines[i] = ""
+        if not converted_items:
+            continue
 
-            new_line = f"{indent}{item} as {item}"
-            lines.insert(insert_position, new_line)
-            modified = True
+        # Items converted from the same line keep the order they have in __all__
+        new_lines: list[str] = []
+        for item in sorted(set(converted_items), key=pending.__getitem__):
+            new_lines.append(f"{indent}{item} as {item}")
+            del pending[item]
+            converted.add(item)
+        new_lines.append(indent + ", ".join(remaining_items) if remaining_items else "")
 
-    result = "\n".join(lines)
-    while "\n\n\n" in result:
-        result = result.replace("\n\n\n", "\n\n")
+        pieces.append(code[last_end : match.start()])
+        pieces.append("\n".join(new_lines))
+        last_end = match.end()
 
-    return result
+    pieces.append(code[last_end:])
+    return BLANK_LINE_RUN_PATTERN.sub("\n\n", "".join(pieces)), converted
 
 
 def _get_display_path(file_path: str) -> str:
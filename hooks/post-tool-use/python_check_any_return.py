@@ -3,6 +3,7 @@
 # requires-python = ">=3.11"
 # dependencies = [
 #   "ast-grep-py>=0.24.1",
+#   "orjson",
 # ]
 # ///
 """
@@ -12,7 +13,7 @@ Detects '-> Any' return type hints after file modifications and provides feedbac
 
 from __future__ import annotations
 
-import json
+import functools
 import re
 import sys
 from pathlib import Path
@@ -25,14 +26,22 @@ from typing import (
 )
 
 import ast_grep_py as sg
+import orjson
 
 TYPE_IGNORE_PATTERN: Pattern[str] = re.compile(r"#\s*type:\s*ignore(?:\[[\w,\s]+\])?(?:\s|$)")
+ANY_RETURN_PROBE_PATTERN: Pattern[str] = re.compile(r"->[\s\\]*(?:Any\b|Optional\[\s*Any\s*\]|None\s*\|\s*Any\b)")
+ANY_RETURN_ANNOTATION: str = r"->\s*(?:Any|Optional\[\s*Any\s*\]|Any\s*\|\s*None|None\s*\|\s*Any)\s*(?::|\Z)"
+ANY_RETURN_ANNOTATION_PATTERN: Pattern[str] = re.compile(ANY_RETURN_ANNOTATION)
+# Hook files, test directories, *_test.py, and any file whose name contains "test_"
+EXCLUDED_PATH_PATTERN: Pattern[str] = re.compile(r"/hooks/|/tests?/|_test\.py$|test_[^/]*$")
 
 
 EXIT_CODE_BLOCK_TOOL: int = 2
 DEFAULT_TEXT_TRUNCATION: int = 80
 LONG_TEXT_TRUNCATION: int = 120
 TAB: str = "\t"
+ANY_RETURN_TYPES: frozenset[str] = frozenset({"Any"})
+OPTIONAL_ANY_RETURN_TYPES: frozenset[str] = frozenset({"Optional[Any]", "Any|None", "None|Any"})
 
 
 class AnyReturnIssue(TypedDict):
@@ -46,6 +55,8 @@ class AnyReturnIssue(TypedDict):
     function_name: str
     text: str
     is_type_ignored: bool
+    return_type_line: int
+    return_type_end_line: int
 
 
 class EditOperation(TypedDict):
@@ -79,22 +90,6 @@ class PostToolUseInput(TypedDict):
     tool_response: dict[str, Any]
 
 
-class AnyReturnContext:
-    """Context for creating Any return type issues."""
-
-    def __init__(
-        self,
-        issue_type: Literal["any_return", "any_optional_return"],
-        node: sg.SgNode,
-        function_name: str,
-        is_type_ignored: bool,
-    ) -> None:
-        self.issue_type: Literal["any_return", "any_optional_return"] = issue_type
-        self.node: sg.SgNode = node
-        self.function_name: str = function_name
-        self.is_type_ignored: bool = is_type_ignored
-
-
 def run_any_return_check() -> None:
     """Main entry point for the PostToolUse hook."""
     hook_filename = Path(__file__).stem.replace("_", "-")
@@ -106,21 +101,19 @@ def run_any_return_check() -> None:
         _handle_hook_error()
 
 
+@functools.lru_cache(maxsize=16)
 def detect_any_return_violations(code: str) -> list[AnyReturnIssue]:
-    """Detect all '-> Any' return type violations in the given code."""
-    root: sg.SgRoot = sg.SgRoot(code, "python")
+    """Detect all '-> Any' return type violations in the given code. Results are shared; do not mutate them."""
+    # Most files never annotate a return with Any; skip parsing them entirely
+    if not ANY_RETURN_PROBE_PATTERN.search(code):
+        return []
+
+    root: sg.SgRoot = _parse(code)
     node: sg.SgNode = root.root()
     source_lines: list[str] = code.split("\n")
 
-    violations: list[AnyReturnIssue] = []
-
-    # Pattern for direct -> Any return type
-    any_return_violations: list[AnyReturnIssue] = _detect_any_returns(node, source_lines)
-    violations.extend(any_return_violations)
-
-    # Pattern for Optional[Any] or Any | None return types
-    optional_any_violations: list[AnyReturnIssue] = _detect_optional_any_returns(node, source_lines)
-    violations.extend(optional_any_violations)
+    # Direct -> Any first, then Optional[Any] or Any | None return types
+    violations: list[AnyReturnIssue] = _detect_any_returns(node, source_lines)
 
     # Filter out type-ignored violations
     filtered_violations: list[AnyReturnIssue] = [
@@ -158,7 +151,7 @@ Detected violations:
 
 def _read_file_content(file_path: str) -> str | None:
     """Read file content with error handling."""
-    if not file_path or not Path(file_path).exists():
+    if not file_path:
         return None
 
     try:
@@ -170,15 +163,15 @@ def _read_file_content(file_path: str) -> str | None:
 
 def parse_input() -> PostToolUseInput:
     """Parse and validate stdin input."""
-    input_raw: str = sys.stdin.read()
+    input_raw: bytes = sys.stdin.buffer.read()
     if not input_raw:
         print("[check-any-return] Skipping: No input provided")
         sys.exit(0)
 
     try:
-        parsed_data: PostToolUseInput = json.loads(input_raw)
+        parsed_data: PostToolUseInput = orjson.loads(input_raw)
         return parsed_data
-    except (json.JSONDecodeError, KeyError, TypeError):
+    except (orjson.JSONDecodeError, KeyError, TypeError):
         print("[check-any-return] Skipping: Invalid input format")
         sys.exit(0)
 
@@ -186,9 +179,22 @@ def parse_input() -> PostToolUseInput:
 def should_process(data: PostToolUseInput) -> bool:
     """Determine if the input should be processed."""
     tool_input = data["tool_input"]
-    tool_response = data["tool_response"]
+    if not isinstance(tool_input, dict):
+        return False
 
-    if not isinstance(tool_input, dict) or not isinstance(tool_response, dict):
+    # Most edits are rejected by path alone, before the tool response is inspected
+    file_path: str = ""
+    if "file_path" in tool_input:
+        file_path = tool_input["file_path"]  # type: ignore[literal-required]
+
+    if not file_path or not file_path.endswith(".py"):
+        return False
+
+    if _is_excluded_path(file_path):
+        return False
+
+    tool_response = data["tool_response"]
+    if not isinstance(tool_response, dict):
         return False
 
     success = tool_response.get("success")
@@ -202,18 +208,7 @@ def should_process(data: PostToolUseInput) -> bool:
             case _:
                 success = False
 
-    if not success:
-        return False
-
-    file_path: str = ""
-    if "file_path" in tool_input:
-        file_path = tool_input["file_path"]  # type: ignore[literal-required]
-
-    if not file_path or not file_path.endswith(".py"):
-        return False
-
-    excluded: bool = _is_excluded_path(file_path)
-    return not excluded
+    return bool(success)
 
 
 def process_tool_input(data: PostToolUseInput) -> list[AnyReturnIssue]:
@@ -228,22 +223,22 @@ def process_tool_input(data: PostToolUseInput) -> list[AnyReturnIssue]:
     if not isinstance(tool_input, dict):
         return []
 
-    new_violations: list[AnyReturnIssue] = []
-    existing_violations: set[str] = _get_existing_violations(file_path, tool_name, tool_input)
-
     # Read the actual file content after modification
     content = _read_file_content(file_path)
     if content is None:
         return []
 
     all_violations = detect_any_return_violations(content)
+    if not all_violations:
+        return []
 
-    for violation in all_violations:
-        violation_key = _create_violation_key(violation)
-        if violation_key not in existing_violations:
-            new_violations.append(violation)
+    # For Write tool, every violation is new since the whole file was written
+    if tool_name not in ("Edit", "MultiEdit"):
+        return all_violations
 
-    return new_violations
+    # Only signatures inside the edited regions can be new, so the pre-edit file never needs rebuilding or parsing
+    regions = _get_edited_regions(content, tool_name, tool_input)
+    return [violation for violation in all_violations if _is_new_violation(violation, regions)]
 
 
 def handle_findings(violations: list[AnyReturnIssue], file_path: str) -> NoReturn:
@@ -288,126 +283,98 @@ def _handle_hook_error() -> NoReturn:
 
 def _is_excluded_path(file_path: str) -> bool:
     """Check if file path should be excluded from processing."""
-    # Exclude hook files themselves
-    if "/hooks/" in file_path:
-        return True
-
-    # Exclude test files (they might use Any for mocking)
-    if (
-        "/test/" in file_path
-        or "/tests/" in file_path
-        or file_path.endswith("_test.py")
-        or "test_" in Path(file_path).name
-    ):
-        return True
-
-    return False
-
-
-def _detect_any_returns(node: sg.SgNode, source_lines: list[str]) -> list[AnyReturnIssue]:
-    """Detect direct '-> Any' return type annotations."""
-    violations: list[AnyReturnIssue] = []
-
-    # Pattern for functions with -> Any return type
-    # Matches: def func() -> Any:
-    function_patterns = [
-        "def $FUNC($$$PARAMS) -> Any:",
-        "async def $FUNC($$$PARAMS) -> Any:",
-    ]
+    return EXCLUDED_PATH_PATTERN.search(file_path) is not None
 
-    for pattern in function_patterns:
-        function_nodes: list[sg.SgNode] = node.find_all(pattern=pattern)
-
-        for function_node in function_nodes:
-            function_name = _extract_function_name(function_node)
-            is_type_ignored = _is_type_ignored(function_node, source_lines)
-
-            context = AnyReturnContext(
-                issue_type="any_return",
-                node=function_node,
-                function_name=function_name,
-                is_type_ignored=is_type_ignored,
-            )
-            issue = _create_any_return_issue(context)
-            violations.append(issue)
-
-    return violations
-
-
-def _detect_optional_any_returns(node: sg.SgNode, source_lines: list[str]) -> list[AnyReturnIssue]:
-    """Detect Optional[Any] and Any | None return type annotations."""
-    violations: list[AnyReturnIssue] = []
-
-    # Patterns for Optional[Any] and Any | None
-    optional_patterns = [
-        "def $FUNC($$$PARAMS) -> Optional[Any]:",
-        "async def $FUNC($$$PARAMS) -> Optional[Any]:",
-        "def $FUNC($$$PARAMS) -> Any | None:",
-        "async def $FUNC($$$PARAMS) -> Any | None:",
-        "def $FUNC($$$PARAMS) -> None | Any:",
-        "async def $FUNC($$$PARAMS) -> None | Any:",
-    ]
-
-    for pattern in optional_patterns:
-        function_nodes: list[sg.SgNode] = node.find_all(pattern=pattern)
-
-        for function_node in function_nodes:
-            function_name = _extract_function_name(function_node)
-            is_type_ignored = _is_type_ignored(function_node, source_lines)
 
-            context = AnyReturnContext(
-                issue_type="any_optional_return",
-                node=function_node,
-                function_name=function_name,
-                is_type_ignored=is_type_ignored,
-            )
-            issue = _create_any_return_issue(context)
-            violations.append(issue)
+@functools.lru_cache(maxsize=32)
+def _parse(code: str) -> sg.SgRoot:
+    """Parse code with ast-grep, reusing the tree for content already parsed in this run."""
+    return sg.SgRoot(code, "python")
 
-    return violations
 
-
-def _create_any_return_issue(context: AnyReturnContext) -> AnyReturnIssue:
-    """Create an AnyReturnIssue object from context."""
-    start: Any = context.node.range().start
-    end: Any = context.node.range().end
+def _detect_any_returns(node: sg.SgNode, source_lines: list[str]) -> list[AnyReturnIssue]:
+    """Detect '-> Any', Optional[Any] and Any | None return type annotations in one traversal."""
+    any_violations: list[AnyReturnIssue] = []
+    optional_any_violations: list[AnyReturnIssue] = []
+
+    # Matches both def and async def, including methods and nested functions
+    function_nodes: list[sg.SgNode] = node.find_all(kind="function_definition")
+
+    for function_node in function_nodes:
+        return_type_node: sg.SgNode | None = function_node.field("return_type")
+        if return_type_node is None:
+            continue
+
+        return_type = "".join(return_type_node.text().split())
+        issue_type: Literal["any_return", "any_optional_return"]
+        if return_type in ANY_RETURN_TYPES:
+            issue_type = "any_return"
+        elif return_type in OPTIONAL_ANY_RETURN_TYPES:
+            issue_type = "any_optional_return"
+        else:
+            continue
+
+        issue = _create_any_return_issue(
+            issue_type,
+            function_node,
+            return_type_node,
+            _extract_function_name(function_node),
+            _is_type_ignored(function_node, source_lines),
+        )
+        if issue_type == "any_return":
+            any_violations.append(issue)
+        else:
+            optional_any_violations.append(issue)
+
+    return any_violations + optional_any_violations
+
+
+def _create_any_return_issue(
+    issue_type: Literal["any_return", "any_optional_return"],
+    node: sg.SgNode,
+    return_type_node: sg.SgNode,
+    function_name: str,
+    is_type_ignored: bool,
+) -> AnyReturnIssue:
+    """Create an AnyReturnIssue object for a function node."""
+    node_range: Any = node.range()
+    start: Any = node_range.start
+    end: Any = node_range.end
+    return_type_range: Any = return_type_node.range()
 
     issue_description: str
     suggestion: str
 
-    if context.issue_type == "any_return":
-        issue_description = f"Function '{context.function_name}' has '-> Any' return type"
+    if issue_type == "any_return":
+        issue_description = f"Function '{function_name}' has '-> Any' return type"
         suggestion = "Replace '-> Any' with a specific type hint (e.g., str, int, dict, List[str], etc.)"
     else:
-        issue_description = f"Function '{context.function_name}' has Optional[Any] or Any | None return type"
+        issue_description = f"Function '{function_name}' has Optional[Any] or Any | None return type"
         suggestion = "Replace Optional[Any] with a specific optional type (e.g., Optional[str], str | None, etc.)"
 
     # Get the function signature line
-    function_text = context.node.text()
-    first_line = function_text.split("\n")[0] if "\n" in function_text else function_text
+    function_text = node.text()
+    first_line = function_text.partition("\n")[0]
 
     issue: AnyReturnIssue = AnyReturnIssue(
-        type=context.issue_type,
+        type=issue_type,
         issue_description=issue_description,
         suggestion=suggestion,
         line=start.line + 1,
         column=start.column,
         end_line=end.line + 1,
         end_column=end.column,
-        function_name=context.function_name,
+        function_name=function_name,
         text=_truncate_text(first_line, DEFAULT_TEXT_TRUNCATION),
-        is_type_ignored=context.is_type_ignored,
+        is_type_ignored=is_type_ignored,
+        return_type_line=return_type_range.start.line + 1,
+        return_type_end_line=return_type_range.end.line + 1,
     )
     return issue
 
 
 def _extract_function_name(function_node: sg.SgNode) -> str:
     """Extract function name from a function node."""
-    func_match: sg.SgNode | None = function_node.get_match("FUNC")
-    if func_match:
-        return func_match.text()
-
-    # Try to get the name field directly
     name_node: sg.SgNode | None = function_node.field("name")
     if name_node:
         return name_node.text()
@@ -456,59 +423,54 @@ def _truncate_text(text: str, max_length: int = DEFAULT_TEXT_TRUNCATION) -> str:
     return truncated_text
 
 
-def _get_existing_violations(
-    file_path: str, tool_name: str, tool_input: WriteToolInput | EditToolInput | MultiEditToolInput
-) -> set[str]:
-    """Get existing Any return violations from old content to avoid duplicate warnings."""
-    existing_violations: set[str] = set()
-
+def _get_edited_regions(
+    content: str, tool_name: str, tool_input: WriteToolInput | EditToolInput | MultiEditToolInput
+) -> list[tuple[int, int, str]]:
+    """Locate the 1-based line ranges each edit's new_string occupies in the post-edit content."""
+    edit_pairs: list[tuple[str, str]] = []
     if tool_name == "Edit":
-        if file_path and Path(file_path).exists():
-            try:
-                old_string = tool_input["old_string"]  # type: ignore[literal-required]
-                new_string = tool_input["new_string"]  # type: ignore[literal-required]
-
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
-
-                if old_string and new_string and new_string in current_content:
-                    pre_edit_content: str = current_content.replace(new_string, old_string, 1)
-                    old_violations = detect_any_return_violations(pre_edit_content)
-                    for violation in old_violations:
-                        existing_violations.add(_create_violation_key(violation))
-            except Exception:
-                pass
-
+        edit_pairs.append((tool_input["old_string"], tool_input["new_string"]))  # type: ignore[literal-required]
     elif tool_name == "MultiEdit":
-        if file_path and Path(file_path).exists():
-            try:
-                with open(file_path, encoding="utf-8") as file_handle:
-                    current_content: str = file_handle.read()
+        for edit in tool_input["edits"]:  # type: ignore[literal-required]
+            if isinstance(edit, dict):
+                edit_pairs.append((edit["old_string"], edit["new_string"]))
+
+    regions: list[tuple[int, int, str]] = []
+    for old_string, new_string in edit_pairs:
+        # A pure deletion cannot introduce a new signature
+        if not new_string:
+            continue
 
-                pre_edit_content: str = current_content
-                edits = tool_input["edits"]  # type: ignore[literal-required]
+        position = content.find(new_string)
+        while position != -1:
+            start_line = content.count("\n", 0, position) + 1
+            regions.append((start_line, start_line + new_string.count("\n"), old_string))
+            position = content.find(new_string, position + len(new_string))
 
-                for edit in reversed(edits):
-                    if isinstance(edit, dict):
-                        edit_old_string = edit["old_string"]
-                        edit_new_string = edit["new_string"]
-                        if edit_old_string and edit_new_string and edit_new_string in pre_edit_content:
-                            pre_edit_content = pre_edit_content.replace(edit_new_string, edit_old_string, 1)
+    return regions
 
-                old_violations = detect_any_return_violations(pre_edit_content)
-                for violation in old_violations:
-                    existing_violations.add(_create_violation_key(violation))
-            except Exception:
-                pass
 
-    # For Write tool, there are no existing violations since it's a new file
+def _is_new_violation(violation: AnyReturnIssue, regions: list[tuple[int, int, str]]) -> bool:
+    """Check if a violation's return annotation was written by the edit rather than carried over from before it."""
+    for start_line, end_line, old_string in regions:
+        if start_line > violation["return_type_end_line"] or end_line < violation["return_type_line"]:
+            continue
+
+        if not _had_any_return(old_string, violation["function_name"]):
+            return True
+    return False
 
-    return existing_violations
 
+def _had_any_return(old_string: str, function_name: str) -> bool:
+    """Check if the replaced text already gave the function an Any or Optional[Any] return annotation."""
+    header_pattern = rf"\bdef\s+{re.escape(function_name)}\s*\("
+    if re.search(header_pattern, old_string):
+        # Parameter edits keep the annotation; stop at the next def so another function's Any is not borrowed
+        signature_pattern = rf"{header_pattern}(?:(?!\bdef\s).)*?{ANY_RETURN_ANNOTATION}"
+        return re.search(signature_pattern, old_string, re.DOTALL) is not None
 
-def _create_violation_key(violation: AnyReturnIssue) -> str:
-    """Create a unique key for a violation to detect duplicates."""
-    return f"{violation['function_name']}:{violation['line']}:{violation['type']}"
+    # A fragment without the def line, such as ") -> Any:", can only belong to the signature it overlaps
+    return ANY_RETURN_ANNOTATION_PATTERN.search(old_string) is not None
 
 
 if __name__ == "__main__":
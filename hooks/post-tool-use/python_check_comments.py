@@ -1,21 +1,22 @@
 #!/usr/bin/env python3
 # /// script
 # requires-python = ">=3.11"
-# dependencies = [
-#   "comment-parser>=1.2.4"
-# ]
+# dependencies = []
 # ///
 
 from __future__ import annotations
 
 import ast
+import functools
+import inspect
+import io
 import json
 import sys
+import tokenize
+from collections import deque
 from pathlib import Path
 from typing import Any, TypedDict, cast
 
-from comment_parser import comment_parser
-
 BDD_KEYWORDS: set[str] = {
     "given",
     "when",
@@ -26,6 +27,18 @@ BDD_KEYWORDS: set[str] = {
     "when & then",
     "when&then",
 }
+SCOPE_CONTAINER_NODES: tuple[type[ast.AST], ...] = (ast.stmt, ast.excepthandler, ast.match_case)
+TYPE_CHECKER_PREFIXES: tuple[str, ...] = (
+    "type:",
+    "noqa",
+    "pyright:",
+    "ruff:",
+    "mypy:",
+    "pylint:",
+    "flake8:",
+    "pyre:",
+    "pytype:",
+)
 SKIP_EXTENSIONS: set[str] = {
     "json",
     "xml",
@@ -72,10 +85,16 @@ def main() -> None:
         print(f"[{hook_filename}] Skipping: No file path provided")
         sys.exit(0)
 
-    if get_file_extension(file_path) in SKIP_EXTENSIONS:
+    ext: str = get_file_extension(file_path)
+    if ext in SKIP_EXTENSIONS:
         print(f"[{hook_filename}] Skipping: Non-code file")
         sys.exit(0)
 
+    # Only Python comments and docstrings are extracted, so other files need no reads or parsing
+    if ext != "py":
+        print(f"[{hook_filename}] Success: No problematic comments/docstrings found")
+        sys.exit(0)
+
     existing_comments: set[str] = set() if tool_name == "Write" else get_existing_comments_normalized(file_path)
 
     all_findings: list[tuple[str, int, str]] = []
@@ -105,17 +124,12 @@ def main() -> None:
         print(f"[{hook_filename}] Skipping: Unexpected error occurred")
         sys.exit(0)
 
-    seen: set[tuple[str, str, int]] = set()
-    unique_findings: list[tuple[str, int, str]] = []
-
+    # Dicts keep insertion order, so the first occurrence of each finding wins
+    unique_findings: dict[tuple[str, str, int], tuple[str, int, str]] = {}
     for finding in all_findings:
-        file_path, line, comment = finding
-        key: tuple[str, str, int] = (file_path, normalize_comment(comment), line)
-        if key not in seen:
-            seen.add(key)
-            unique_findings.append(finding)
+        unique_findings.setdefault((finding[0], normalize_comment(finding[2]), finding[1]), finding)
 
-    message: str = build_error_message(unique_findings)
+    message: str = build_error_message(list(unique_findings.values()))
 
     if not message.strip():
         print(f"[{hook_filename}] Success: No problematic comments/docstrings found")
@@ -145,89 +159,36 @@ def _process_edit_tool(tool_input: EditToolInput, file_path: str) -> list[tuple[
     old_string = tool_input["old_string"]
 
     start_line: int = 1
-    if new_string and Path(file_path).exists():
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                current_content = f.read()
-            index = current_content.find(new_string)
-            if index != -1:
-                start_line = current_content[:index].count("\n") + 1
-        except Exception:
-            pass
-
-    old_comments: set[str] = set()
-    if old_string:
-        old_comment_list = extract_comments_from_string(old_string, file_path)
-        for comment in old_comment_list:
-            text = get_comment_text(comment)
-            if text:
-                old_comments.add(normalize_comment(text))
+    current_content = read_file_content(file_path)
+    if current_content is not None:
+        index = current_content.find(new_string)
+        if index != -1:
+            start_line = current_content[:index].count("\n") + 1
 
-        old_docstring_list = extract_docstrings_from_string(old_string, file_path)
-        for _, _, docstring_text in old_docstring_list:
-            if docstring_text:
-                old_comments.add(normalize_comment(docstring_text))
+    old_comments: set[str] = _collect_normalized([old_string], file_path)
 
     return check_comments_in_content(new_string, file_path, old_comments, start_line)
 
 
 def _process_multiedit_tool(tool_input: MultiEditToolInput, file_path: str) -> list[tuple[str, int, str]]:
     """Process MultiEdit tool input and return findings."""
-    all_old_comments: set[str] = set()
-    edits = tool_input["edits"]
-
-    for edit in edits:
-        if not isinstance(edit, dict):
-            continue
-
-        old_string = edit["old_string"]
-        if old_string:
-            old_comment_list = extract_comments_from_string(old_string, file_path)
-            for comment in old_comment_list:
-                text = get_comment_text(comment)
-                if text:
-                    all_old_comments.add(normalize_comment(text))
-
-            old_docstring_list = extract_docstrings_from_string(old_string, file_path)
-            for _, _, docstring_text in old_docstring_list:
-                if docstring_text:
-                    all_old_comments.add(normalize_comment(docstring_text))
-
-    all_new_comments: set[str] = set()
-    for edit in edits:
-        if not isinstance(edit, dict):
-            continue
-
-        new_string = edit["new_string"]
-        if new_string:
-            new_comment_list = extract_comments_from_string(new_string, file_path)
-            for comment in new_comment_list:
-                text = get_comment_text(comment)
-                if text:
-                    all_new_comments.add(normalize_comment(text))
-
-            new_docstring_list = extract_docstrings_from_string(new_string, file_path)
-            for _, _, docstring_text in new_docstring_list:
-                if docstring_text:
-                    all_new_comments.add(normalize_comment(docstring_text))
-
-    comments_to_check = all_new_comments - all_old_comments
+    edits = [edit for edit in tool_input["edits"] if isinstance(edit, dict)]
+    all_old_comments: set[str] = _collect_normalized([edit["old_string"] for edit in edits], file_path)
+    comments_to_check: set[str] = _collect_normalized(
+        [edit["new_string"] for edit in edits], file_path, excluded=all_old_comments
+    )
 
     if not comments_to_check:
         return []
 
-    try:
-        if Path(file_path).exists():
-            with open(file_path, encoding="utf-8") as f:
-                file_content = f.read()
-        else:
-            return []
-    except Exception:
+    file_content = read_file_content(file_path)
+    if file_content is None:
         return []
 
     all_comments = extract_comments_from_string(file_content, file_path)
     all_docstrings = extract_docstrings_from_string(file_content, file_path)
     all_findings: list[tuple[str, int, str]] = []
+    ext = get_file_extension(file_path)
 
     for comment in all_comments:
         text = get_comment_text(comment)
@@ -239,14 +200,13 @@ def _process_multiedit_tool(tool_input: MultiEditToolInput, file_path: str) -> l
         if normalized not in comments_to_check:
             continue
 
-        if is_shebang_comment(text):
+        if is_shebang_comment(normalized):
             continue
 
-        if is_bdd_comment(text):
+        if is_bdd_comment(normalized):
             continue
 
-        ext = get_file_extension(file_path)
-        if ext == "py" and is_python_type_comment(text):
+        if ext == "py" and is_python_type_comment(normalized):
             continue
 
         line = get_comment_line(comment)
@@ -266,6 +226,37 @@ def _process_multiedit_tool(tool_input: MultiEditToolInput, file_path: str) -> l
     return all_findings
 
 
+def _collect_normalized(
+    strings: list[str], file_path: str, excluded: set[str] | frozenset[str] = frozenset()
+) -> set[str]:
+    """Collect the normalized comments and docstrings found in each of the given code snippets, minus excluded."""
+    normalized: set[str] = set()
+
+    # Snippets are parsed one by one so a single unparsable edit cannot hide the others
+    for string in strings:
+        if not string:
+            continue
+
+        for comment in extract_comments_from_string(string, file_path):
+            text = get_comment_text(comment)
+            if not text:
+                continue
+
+            normalized_text = normalize_comment(text)
+            if normalized_text not in excluded:
+                normalized.add(normalized_text)
+
+        for _, _, docstring_text in extract_docstrings_from_string(string, file_path):
+            if not docstring_text:
+                continue
+
+            normalized_doc = normalize_comment(docstring_text)
+            if normalized_doc not in excluded:
+                normalized.add(normalized_doc)
+
+    return normalized
+
+
 def build_error_message(findings: list[tuple[str, int, str]]) -> str:
     """Build the standard error message for detected comments and docstrings."""
     if not findings:
@@ -340,7 +331,7 @@ def check_comments_in_content(
     if ext != "py":
         return findings
 
-    comments: list[Any] = extract_comments_from_string(content, file_path)
+    comments: list[tuple[str, int]] = extract_comments_from_string(content, file_path)
 
     for comment in comments:
         text: str = get_comment_text(comment)
@@ -352,13 +343,13 @@ def check_comments_in_content(
         if normalized in existing_comments:
             continue
 
-        if is_shebang_comment(text):
+        if is_shebang_comment(normalized):
             continue
 
-        if is_bdd_comment(text):
+        if is_bdd_comment(normalized):
             continue
 
-        if ext == "py" and is_python_type_comment(text):
+        if ext == "py" and is_python_type_comment(normalized):
             continue
 
         line: int = get_comment_line(comment) + base_line - 1
@@ -384,7 +375,7 @@ def get_existing_comments_normalized(file_path: str) -> set[str]:
     """Get set of normalized existing comments and docstrings from file."""
     normalized: set[str] = set()
 
-    comments: list[Any] = extract_comments_from_file(file_path)
+    comments: list[tuple[str, int]] = extract_comments_from_file(file_path)
     for comment in comments:
         text: str = get_comment_text(comment)
         if text:
@@ -398,21 +389,41 @@ def get_existing_comments_normalized(file_path: str) -> set[str]:
     return normalized
 
 
-def extract_comments_from_file(file_path: str) -> list[Any]:
-    """Extract comments from existing file."""
-    if not file_path or not Path(file_path).exists():
-        return []
+@functools.lru_cache(maxsize=4)
+def read_file_content(file_path: str) -> str | None:
+    """Read file content once per run, returning None if it is missing or unreadable."""
+    if not file_path:
+        return None
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content: str = f.read()
-        return extract_comments_from_string(content, file_path)
-    except Exception:
+        # Binary reads are sized from fstat in one allocation and skip the incremental text decoder
+        with open(file_path, "rb") as f:
+            content = f.read().decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    if "\r" in content:
+        # Same universal-newline translation the previous text-mode read applied
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def extract_comments_from_file(file_path: str) -> list[tuple[str, int]]:
+    """Extract comments from existing file."""
+    content = read_file_content(file_path)
+    if content is None:
         return []
 
+    return extract_comments_from_string(content, file_path)
 
-def extract_comments_from_string(content: str, file_path: str) -> list[Any]:
-    """Extract comments from Python files only."""
+
+@functools.lru_cache(maxsize=32)
+def extract_comments_from_string(content: str, file_path: str) -> list[tuple[str, int]]:
+    """
+    Extract comments from Python files only.
+    Returns list of (comment_text, line_number) tuples, with the leading '#' removed.
+    Results are shared between calls with the same content; do not mutate them.
+    """
     if not content:
         return []
 
@@ -421,17 +432,24 @@ def extract_comments_from_string(content: str, file_path: str) -> list[Any]:
     if ext != "py":
         return []
 
+    comments: list[tuple[str, int]] = []
     try:
-        comments = comment_parser.extract_comments_from_str(content, mime="text/x-python")
-        return comments if comments else []
-    except Exception:
+        for token in tokenize.generate_tokens(io.StringIO(content).readline):
+            if token.type == tokenize.COMMENT:
+                comments.append((token.string[1:], token.start[0]))
+    except (tokenize.TokenError, SyntaxError):
+        # Snippets with unbalanced brackets, strings or indentation cannot be tokenized
         return []
 
+    return comments
+
 
+@functools.lru_cache(maxsize=32)
 def extract_docstrings_from_string(content: str, file_path: str) -> list[tuple[str, int, str]]:
     """
     Extract docstrings from Python code.
     Returns list of (file_path, line_number, docstring_text) tuples.
+    Results are shared between calls with the same content; do not mutate them.
     """
     findings: list[tuple[str, int, str]] = []
 
@@ -448,75 +466,45 @@ def extract_docstrings_from_string(content: str, file_path: str) -> list[tuple[s
     except SyntaxError:
         return findings
 
-    module_doc = ast.get_docstring(tree)
-    if module_doc:
-        if tree.body and isinstance(tree.body[0], ast.Expr):
-            if isinstance(tree.body[0].value, ast.Constant):
-                line_no = tree.body[0].lineno
-                findings.append((file_path, line_no, module_doc))
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef):
-            class_doc = ast.get_docstring(node)
-            if class_doc:
-                if node.body and isinstance(node.body[0], ast.Expr):
-                    if isinstance(node.body[0].value, ast.Constant):
-                        line_no = node.body[0].lineno
-                        findings.append((file_path, line_no, class_doc))
-
-        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
-            func_doc = ast.get_docstring(node)
-            if func_doc:
-                if node.body and isinstance(node.body[0], ast.Expr):
-                    if isinstance(node.body[0].value, ast.Constant):
-                        line_no = node.body[0].lineno
-                        findings.append((file_path, line_no, func_doc))
+    # Breadth-first like ast.walk, but only through statements; expressions never contain a def or class
+    pending: deque[ast.AST] = deque([tree])
+    while pending:
+        node = pending.popleft()
+        pending.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, SCOPE_CONTAINER_NODES))
+
+        if not isinstance(node, ast.Module | ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef):
+            continue
+
+        first = node.body[0] if node.body else None
+        if (
+            isinstance(first, ast.Expr)
+            and isinstance(first.value, ast.Constant)
+            and isinstance(first.value.value, str)
+        ):
+            docstring = inspect.cleandoc(first.value.value)
+            if docstring:
+                findings.append((file_path, first.lineno, docstring))
 
     return findings
 
 
 def extract_docstrings_from_file(file_path: str) -> list[tuple[str, int, str]]:
     """Extract docstrings from existing file."""
-    if not file_path or not Path(file_path).exists():
+    content = read_file_content(file_path)
+    if content is None:
         return []
 
-    try:
-        with open(file_path, encoding="utf-8") as f:
-            content: str = f.read()
-        return extract_docstrings_from_string(content, file_path)
-    except Exception:
-        return []
+    return extract_docstrings_from_string(content, file_path)
 
 
-def get_comment_text(comment: object) -> str:
-    """Safely extract text from comment object."""
-    try:
-        if hasattr(comment, "text"):
-            text_attr = comment.text  # type: ignore[attr-defined]
-            if callable(text_attr):
-                return str(text_attr())
-            return str(text_attr)
-        return ""
-    except Exception:
-        return ""
+def get_comment_text(comment: tuple[str, int]) -> str:
+    """Extract text from a comment tuple."""
+    return comment[0]
 
 
-def get_comment_line(comment: object) -> int:
-    """Safely extract line number from comment object."""
-    try:
-        if hasattr(comment, "line_number"):
-            line_attr = comment.line_number  # type: ignore[attr-defined]
-            if callable(line_attr):
-                result = line_attr()
-                if result is not None:
-                    return int(result)  # type: ignore[arg-type]
-                return 1
-            if line_attr is not None:
-                return int(line_attr)  # type: ignore[arg-type]
-            return 1
-        return 1
-    except Exception:
-        return 1
+def get_comment_line(comment: tuple[str, int]) -> int:
+    """Extract line number from a comment tuple."""
+    return comment[1]
 
 
 def normalize_comment(text: str) -> str:
@@ -524,39 +512,19 @@ def normalize_comment(text: str) -> str:
     return text.strip().lower()
 
 
-def is_shebang_comment(comment_text: str) -> bool:
-    """Check if comment is a shebang line (for any script language)."""
-    stripped: str = comment_text.strip()
-    return stripped.startswith("!/")
-
-
-def is_bdd_comment(comment_text: str) -> bool:
-    """Check if comment is a BDD keyword."""
-    stripped: str = comment_text.strip().lower()
-    return stripped in BDD_KEYWORDS
-
+def is_shebang_comment(normalized_text: str) -> bool:
+    """Check if an already normalized comment is a shebang line (for any script language)."""
+    return normalized_text.startswith("!/")
 
-def is_python_type_comment(comment_text: str) -> bool:
-    """Check if comment is a Python type checker directive."""
-    stripped: str = comment_text.strip().lower()
 
-    type_checker_prefixes = [
-        "type:",
-        "noqa",
-        "pyright:",
-        "ruff:",
-        "mypy:",
-        "pylint:",
-        "flake8:",
-        "pyre:",
-        "pytype:",
-    ]
+def is_bdd_comment(normalized_text: str) -> bool:
+    """Check if an already normalized comment is a BDD keyword."""
+    return normalized_text in BDD_KEYWORDS
 
-    for prefix in type_checker_prefixes:
-        if stripped.startswith(prefix):
-            return True
 
-    return False
+def is_python_type_comment(normalized_text: str) -> bool:
+    """Check if an already normalized comment is a Python type checker directive."""
+    return normalized_text.startswith(TYPE_CHECKER_PREFIXES)
 
 
 def get_file_extension(file_path: str) -> str:
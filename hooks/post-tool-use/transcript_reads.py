@@ -0,0 +1,104 @@
+# pyright: reportMissingImports=false
+"""
+Incremental index of the files a session has Read, shared by the inject_* hooks.
+
+The index for each transcript is pickled under ~/.cache/cc-hooks together with the byte offset it covers,
+so each hook only parses the lines appended since the last run.
+Not a hook itself: the injectors import it from their own directory, which is on sys.path when run as scripts.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import TypedDict
+
+import orjson
+
+
+class TranscriptReadCache(TypedDict):
+    size: int
+    mtime_ns: int
+    paths: set[str]
+
+
+TRANSCRIPT_CACHE_DIR = Path.home() / ".cache" / "cc-hooks"
+TOOL_USE_NEEDLE = orjson.dumps("tool_use")
+READ_TOOL_NEEDLE = orjson.dumps("Read")
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_path(path: str) -> str:
+    return os.path.realpath(path)
+
+
+def load_read_paths(transcript_path: Path) -> set[str]:
+    """Return the canonical paths of every file Read in the transcript."""
+    try:
+        stat = transcript_path.stat()
+    except OSError:
+        return set()
+
+    cache_key = hashlib.sha1(str(transcript_path).encode()).hexdigest()
+    cache_path = TRANSCRIPT_CACHE_DIR / f"{cache_key}.pkl"
+    cache = _load_transcript_cache(cache_path)
+
+    if cache and cache["size"] == stat.st_size and cache["mtime_ns"] == stat.st_mtime_ns:
+        return cache["paths"]
+
+    offset = 0
+    paths: set[str] = set()
+    if cache and cache["size"] < stat.st_size:
+        offset = cache["size"]
+        paths = cache["paths"]
+
+    consumed = offset
+    try:
+        with open(transcript_path, "rb", buffering=1024 * 1024) as f:
+            f.seek(offset)
+            for raw_line in f:
+                # An unterminated last line may still be mid-write; resume before it
+                if raw_line.endswith(b"\n"):
+                    consumed += len(raw_line)
+
+                if TOOL_USE_NEEDLE not in raw_line or READ_TOOL_NEEDLE not in raw_line:
+                    continue
+
+                try:
+                    entry = orjson.loads(raw_line)
+                    if entry["type"] != "assistant":
+                        continue
+
+                    for block in entry["message"]["content"]:
+                        if block["type"] == "tool_use" and block["name"] == "Read":
+                            paths.add(canonical_path(block["input"]["file_path"]))
+                except (orjson.JSONDecodeError, KeyError, TypeError):
+                    continue
+    except OSError:
+        return paths
+
+    _save_transcript_cache(cache_path, TranscriptReadCache(size=consumed, mtime_ns=stat.st_mtime_ns, paths=paths))
+    return paths
+
+
+def _load_transcript_cache(cache_path: Path) -> TranscriptReadCache | None:
+    try:
+        with open(cache_path, "rb") as f:
+            cache: TranscriptReadCache = pickle.load(f)
+        return cache
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+
+def _save_transcript_cache(cache_path: Path, cache: TranscriptReadCache) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
@@ -46,17 +46,7 @@ POST_TOOL_USE_CONFIG: list[HookMatcher] = [
             ),
             HookCommand(
                 type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_conftest.py",
-                asyncable=False,
-            ),
-            HookCommand(
-                type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_knowledge.py",
-                asyncable=False,
-            ),
-            HookCommand(
-                type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_language_guide.py",
+                command="uv run ~/.claude/hooks/post-tool-use/inject_all.py",
                 asyncable=False,
             ),
             HookCommand(
@@ -121,17 +111,10 @@ POST_TOOL_USE_CONFIG: list[HookMatcher] = [
         hooks=[
             HookCommand(
                 type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_knowledge.py",
-                asyncable=False,
-            ),
-            HookCommand(
-                type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_language_guide.py",
-                asyncable=False,
-            ),
-            HookCommand(
-                type="command",
-                command="uv run ~/.claude/hooks/post-tool-use/inject_conftest.py",
+                command=(
+                    "uv run ~/.claude/hooks/post-tool-use/inject_all.py "
+                    "inject_knowledge inject_language_guide inject_conftest"
+                ),
                 asyncable=False,
             ),
         ],